@@ -0,0 +1,3 @@
+"""
+Benchmarks de mcstats (ver benchmarks/run.py). No forman parte del paquete.
+"""
@@ -0,0 +1,134 @@
+"""
+Comprobación de paridad de las clasificaciones por objeto y los puestos
+
+ItemMatrix tiene dos implementaciones de top() y ranks(): la vectorizada
+con NumPy y la de montículos y bisect sin él; y classify da el mismo
+resultado en modo streaming (jugadores en cualquier orden) que en el
+normal. Con jugadores sintéticos de benchmarks/world.py (más unas
+cantidades que no caben en 32 bits, que van por otro camino con NumPy)
+comprueba que:
+
+- top(), leaderboards() y player_ranks() coinciden con y sin NumPy, y los
+  puestos con un recuento directo
+- classify da lo mismo con y sin streaming, con las clasificaciones por
+  objeto y los puestos activados
+
+    python -m benchmarks.parity --players 2000 --seed 3
+
+Sale con código 1 si algo no coincide.
+"""
+
+import argparse
+import bisect
+import dataclasses
+import random
+import sys
+import uuid
+
+from benchmarks.world import activity_level, player_advancements, player_stats
+from mcstats import items as items_module
+from mcstats.classify import classify, is_bot
+from mcstats.config import Config
+from mcstats.items import ITEM_CATEGORIES, ItemMatrix
+from mcstats.log import setup_logging
+from mcstats.parse import ParseResult, build_player
+
+def synthetic_players(count, seed):
+    rng = random.Random(seed)
+    players = []
+    for i in range(count):
+        bot = rng.random() < 0.03
+        hours = activity_level(rng)
+        stats = player_stats(rng, hours, bot)
+        # Algunas cantidades enormes: sin empaquetar en 64 bits con NumPy
+        if rng.random() < 0.01:
+            stats["stats"].setdefault("minecraft:mined", {})["minecraft:dirt"] = rng.randint(1 << 32, 1 << 40)
+        players.append(build_player(str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+                                    f"bot_{i}" if bot else f"Player{i}", stats, player_advancements(rng, hours)))
+    return players
+
+def item_matrix(players, with_numpy):
+    saved = items_module.numpy
+    if not with_numpy:
+        items_module.numpy = None
+    try:
+        matrix = ItemMatrix(ranked=True)
+        for order, player in enumerate(players):
+            matrix.add(player, order)
+        tops = {category: matrix.top(category, 10) for category in matrix.entries}
+        return tops, matrix.leaderboards(10), matrix.player_ranks(players)
+    finally:
+        items_module.numpy = saved
+
+def counted_ranks(players, ranks):
+    """Puestos por objeto de player_ranks que no cuadran con contar quién tiene más"""
+    counts = {category: {} for category in ITEM_CATEGORIES}
+    for p in players:
+        for category, ids, values in p.items:
+            for item_id, value in zip(ids, values):
+                counts[category].setdefault(item_id, []).append(value)
+    for values in (v for by_item in counts.values() for v in by_item.values()):
+        values.sort()
+    wrong = 0
+    for p in players:
+        for category, ids, values in p.items:
+            for item_id, value, rank in zip(ids, values, ranks[p.uuid]["items"][category]):
+                others = counts[category][item_id]
+                expected = len(others) - bisect.bisect_right(others, value) + 1 if value > 0 else 0
+                wrong += rank != expected
+    return wrong
+
+def check_item_matrix(players):
+    if items_module.numpy is None:
+        print("⚠️  Sin NumPy: solo se comprueba la implementación sin él")
+    real = [p for p in players if not is_bot(p)]
+    fallback = item_matrix(real, with_numpy=False)
+    failures = []
+    if items_module.numpy is not None:
+        vectorized = item_matrix(real, with_numpy=True)
+        for name, a, b in zip(("top", "leaderboards", "player_ranks"), vectorized, fallback):
+            if a != b:
+                failures.append(f"{name} con NumPy ≠ sin NumPy")
+    wrong = counted_ranks(real, fallback[2])
+    if wrong:
+        failures.append(f"{wrong} puestos por objeto no cuadran con el recuento")
+    return failures
+
+def classification_data(classification):
+    return {
+        "real": [p.uuid for p in classification.real],
+        "bots": [p.uuid for p in classification.bots],
+        "boards": {key: [p.uuid for p in board] for key, board in classification.boards.items()},
+        "item_boards": classification.item_boards,
+        "ranks": classification.ranks,
+    }
+
+def check_streaming(players, seed):
+    config = Config(top_limit=100, item_leaderboards="items.json", stat_ranks=True)
+    normal = classify(ParseResult({}, list(enumerate(players))), config)
+    # En streaming los jugadores llegan en cualquier orden, con su posición
+    arrival = list(enumerate(players))
+    random.Random(seed).shuffle(arrival)
+    streaming = classify(ParseResult({}, iter(arrival)), dataclasses.replace(config, streaming=True))
+    a, b = classification_data(normal), classification_data(streaming)
+    return [f"{key} en streaming ≠ normal" for key in a if a[key] != b[key]]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="benchmarks.parity", description="Paridad de ItemMatrix y classify")
+    parser.add_argument("--players", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+    # El aviso de memoria del modo streaming con puestos no interesa aquí
+    setup_logging("error")
+
+    players = synthetic_players(args.players, args.seed)
+    failures = check_item_matrix(players) + check_streaming(players, args.seed)
+    for failure in failures:
+        print(f"❌ {failure}")
+    if failures:
+        return 1
+    print(f"✅ {args.players} jugadores: ItemMatrix con y sin NumPy y classify con y sin streaming coinciden")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
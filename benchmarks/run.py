@@ -0,0 +1,218 @@
+"""
+Benchmark del generador contra mundos sintéticos servidos por SFTP local
+
+Para cada combinación de tamaño, latencia y modo de transferencia genera
+(o reutiliza) un mundo, lo sirve con BenchServer y ejecuta las etapas de
+mcstats con las métricas del propio generador (mcstats/metrics.py); en
+modo tar la descarga del archivo cuenta dentro de connect. Del generador
+solo se muestran los avisos; el resultado va a un JSON:
+
+    python -m benchmarks.run --players 1000,10000 --latency 0,0.05 \\
+        --modes sftp,tar --output bench.json --compare bench-anterior.json
+
+Con --parse-workers 0,4 cada caso se repite con el parse en 4 procesos y
+se anota la aceleración de fetch+parse y del total frente al parse en los
+hilos de descarga (0).
+
+Los mundos se guardan en --worlds (por defecto ~/.cache/mcstats-bench) para
+no regenerarlos en cada ejecución.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timezone
+
+from benchmarks.sftp_server import BenchServer
+from benchmarks.world import generate_world
+from mcstats import jsonio
+from mcstats.aggregate import aggregate
+from mcstats.cache import Cache
+from mcstats.classify import classify
+from mcstats.config import Config
+from mcstats.fetch import fetch, open_source
+from mcstats.log import setup_logging
+from mcstats.metrics import Metrics
+from mcstats.parse import parse
+from mcstats.render import render
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STAGES = ("connect", "fetch", "parse", "classify", "aggregate", "render")
+# Partes de fetch que mcstats mide por separado
+FETCH_PARTS = {"agent": "fetch", "names": "fetch", "skins": "fetch", "list": "fetch", "stats": "fetch"}
+RESULTS_VERSION = 1
+
+def world_dir(worlds, players, seed):
+    path = os.path.join(worlds, f"world-{players}-{seed}")
+    if not os.path.exists(os.path.join(path, "usercache.json")):
+        print(f"🌍 Generando mundo de {players} jugadores en {path}...", file=sys.stderr)
+        generate_world(path, players, seed)
+    return path
+
+def world_size(root):
+    total = 0
+    for folder, _, files in os.walk(root):
+        total += sum(os.path.getsize(os.path.join(folder, f)) for f in files)
+    return total
+
+def run_once(root, port, mode, workers, parse_workers, streaming, output_dir):
+    config = Config(
+        ssh_host="127.0.0.1", ssh_port=port, ssh_user="bench", ssh_password="bench",
+        server_root=root, transfer_mode=mode, fetch_workers=workers, parse_workers=parse_workers,
+        streaming=streaming,
+        template_path=os.path.join(REPO_ROOT, "template.html"),
+        output_html=os.path.join(output_dir, "index.html"),
+        details_dir=os.path.join(output_dir, "players"),
+        artifacts_manifest=os.path.join(output_dir, "artifacts.json"),
+        # Con streaming se mide la memoria acotada: sin cantidades por objeto
+        item_leaderboards="" if streaming else os.path.join(output_dir, "items.json"),
+        stat_ranks=not streaming,
+        force=True,
+    )
+    metrics = Metrics()
+    source, ssh = open_source(config, metrics)
+    try:
+        fetched = fetch(config, source, Cache(items=config.item_stats), ssh, metrics)
+        classification = classify(parse(fetched, config, metrics=metrics), config, metrics)
+        bytes_read = source.bytes_read
+    finally:
+        source.close()
+        if ssh is not None:
+            ssh.close()
+    render(classification, aggregate(classification, metrics), config, metrics=metrics)
+
+    measured = metrics.as_dict()["stages"]
+    timings = {stage: 0.0 for stage in STAGES}
+    for name, stage in measured.items():
+        timings[FETCH_PARTS.get(name, name)] += stage["wall_seconds"]
+
+    return {
+        "stages": timings,
+        "total": sum(timings.values()),
+        "players": measured.get("parse", {}).get("players", 0),
+        "bytes_read": bytes_read,
+        "published": len(classification.real) + len(classification.bots),
+        "metrics": measured,
+    }
+
+def best_of(runs):
+    """La repetición más rápida (la menos afectada por ruido) y el resto como referencia"""
+    best = min(runs, key=lambda r: r["total"])
+    return dict(best, repeats=[r["total"] for r in runs])
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(results, previous_path):
+    """Tabla de variación por etapa frente a un JSON anterior"""
+    with open(previous_path, 'r', encoding='utf-8') as f:
+        previous = {run_key(r): r for r in json.load(f).get("runs", [])}
+
+    print(f"\n{'caso':<32} {'etapa':<10} {'antes':>9} {'ahora':>9} {'cambio':>8}")
+    for run in results["runs"]:
+        before = previous.get(run_key(run))
+        if before is None:
+            continue
+        for stage in STAGES + ("total",):
+            old = before["stages"].get(stage) if stage != "total" else before["total"]
+            new = run["stages"][stage] if stage != "total" else run["total"]
+            if not old:
+                continue
+            print(f"{'/'.join(map(str, run_key(run))):<32} {stage:<10} {old:>8.3f}s {new:>8.3f}s {(new - old) / old:>+8.1%}")
+
+def run_key(run):
+    return (run["world_players"], run["latency"], run["mode"], run["workers"], run.get("parse_workers", 0),
+            run["streaming"])
+
+def speedup(run, serial):
+    """Aceleración frente al mismo caso con el parse en los hilos de descarga"""
+    def fetch_parse(r):
+        return r["stages"]["fetch"] + r["stages"]["parse"]
+    return {
+        "fetch_parse": fetch_parse(serial) / fetch_parse(run) if fetch_parse(run) else None,
+        "total": serial["total"] / run["total"] if run["total"] else None,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="benchmarks.run", description="Benchmark de mcstats con SFTP local")
+    parser.add_argument("--players", default="1000", help="tamaños de mundo separados por comas")
+    parser.add_argument("--latency", default="0", help="RTT simulado en segundos, separados por comas")
+    parser.add_argument("--modes", default="sftp", help="modos de transferencia: sftp, tar, agent")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--parse-workers", default="0",
+                        help="procesos de parse separados por comas (0 = en los hilos de descarga)")
+    parser.add_argument("--streaming", action="store_true")
+    parser.add_argument("--repeat", type=int, default=1, help="repeticiones de cada caso (se guarda la mejor)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--worlds", default=os.path.expanduser("~/.cache/mcstats-bench"))
+    parser.add_argument("--output", default="bench.json")
+    parser.add_argument("--compare", help="JSON de una ejecución anterior para comparar")
+    args = parser.parse_args(argv)
+    setup_logging("warning")
+
+    results = {
+        "version": RESULTS_VERSION,
+        "revision": git_revision(),
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "json_backend": jsonio.BACKEND,
+        "runs": [],
+    }
+    # Casos con el parse en los hilos, para calcular la aceleración
+    serial_runs = {}
+
+    for players in (int(n) for n in args.players.split(",")):
+        root = world_dir(args.worlds, players, args.seed)
+        size = world_size(root)
+        for latency in (float(l) for l in args.latency.split(",")):
+            with BenchServer(root, latency) as server:
+                for mode, parse_workers in itertools.product(args.modes.split(","),
+                                                             (int(n) for n in args.parse_workers.split(","))):
+                    runs = []
+                    for _ in range(args.repeat):
+                        with tempfile.TemporaryDirectory() as output_dir:
+                            runs.append(run_once(root, server.port, mode, args.workers, parse_workers,
+                                                 args.streaming, output_dir))
+                    run = dict(best_of(runs), world_players=players, world_bytes=size, latency=latency,
+                               mode=mode, workers=args.workers, parse_workers=parse_workers,
+                               streaming=args.streaming)
+                    run["throughput"] = {
+                        "fetch_mb_s": run["bytes_read"] / 1048576 / run["stages"]["fetch"] if run["stages"]["fetch"] else None,
+                        "parse_players_s": run["players"] / run["stages"]["parse"] if run["stages"]["parse"] > 0 else None,
+                        "render_players_s": run["published"] / run["stages"]["render"] if run["stages"]["render"] else None,
+                    }
+                    serial = serial_runs.get(run_key(dict(run, parse_workers=0)))
+                    if parse_workers and serial is not None:
+                        run["speedup"] = speedup(run, serial)
+                    elif not parse_workers:
+                        serial_runs[run_key(run)] = run
+                    results["runs"].append(run)
+                    stages = "  ".join(f"{s} {run['stages'][s]:.2f}s" for s in STAGES)
+                    label = f"{mode}, {parse_workers} procesos de parse" if parse_workers else mode
+                    print(f"⏱️  {players} jugadores, RTT {latency * 1000:.0f} ms, {label}: {stages}  (total {run['total']:.2f}s)",
+                          file=sys.stderr)
+                    if "speedup" in run:
+                        print(f"   ⚡ frente al parse en hilos: fetch+parse x{run['speedup']['fetch_parse']:.2f}, "
+                              f"total x{run['speedup']['total']:.2f}", file=sys.stderr)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=1)
+    print(f"💾 Resultados en {args.output}", file=sys.stderr)
+
+    if args.compare:
+        compare(results, args.compare)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
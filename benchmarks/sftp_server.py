@@ -0,0 +1,220 @@
+"""
+Servidor SSH/SFTP de prueba, en el mismo proceso, para los benchmarks
+
+Sirve una carpeta como raíz del SFTP y ejecuta los comandos de los modos
+tar y agent con esa carpeta como directorio de trabajo. Acepta cualquier
+usuario y contraseña. Con latency > 0 las conexiones pasan por un proxy
+que retrasa cada sentido latency/2 segundos: simula el RTT de una red real
+sin limitar el caudal (las peticiones encadenadas no se serializan).
+"""
+
+import logging
+import os
+import queue
+import socket
+import subprocess
+import threading
+import time
+
+import paramiko
+from paramiko import SFTPAttributes, SFTPHandle, SFTPServer, SFTPServerInterface, SFTP_OK
+
+logging.getLogger("benchmarks.sftp_server").setLevel(logging.CRITICAL)
+
+_host_key = None
+
+def host_key():
+    global _host_key
+    if _host_key is None:
+        _host_key = paramiko.RSAKey.generate(2048)
+    return _host_key
+
+class RootedHandle(SFTPHandle):
+    def stat(self):
+        return SFTPAttributes.from_stat(os.fstat(self.readfile.fileno()))
+
+class RootedSFTP(SFTPServerInterface):
+    """SFTP limitado a server.root"""
+    def __init__(self, server, *args, root=None, **kwargs):
+        super().__init__(server, *args, **kwargs)
+        self.root = root
+
+    def local_path(self, path):
+        return os.path.join(self.root, self.canonicalize(path).lstrip("/"))
+
+    def list_folder(self, path):
+        folder = self.local_path(path)
+        try:
+            attrs = []
+            with os.scandir(folder) as entries:
+                for entry in entries:
+                    attr = SFTPAttributes.from_stat(entry.stat())
+                    attr.filename = entry.name
+                    attrs.append(attr)
+            return attrs
+        except OSError as e:
+            return SFTPServer.convert_errno(e.errno)
+
+    def stat(self, path):
+        try:
+            return SFTPAttributes.from_stat(os.stat(self.local_path(path)))
+        except OSError as e:
+            return SFTPServer.convert_errno(e.errno)
+
+    lstat = stat
+
+    def open(self, path, flags, attr):
+        try:
+            if flags & (os.O_WRONLY | os.O_RDWR):
+                f = open(self.local_path(path), "wb")
+            else:
+                f = open(self.local_path(path), "rb")
+        except OSError as e:
+            return SFTPServer.convert_errno(e.errno)
+        handle = RootedHandle(flags)
+        handle.readfile = f
+        handle.writefile = f
+        return handle
+
+    def remove(self, path):
+        try:
+            os.remove(self.local_path(path))
+            return SFTP_OK
+        except OSError as e:
+            return SFTPServer.convert_errno(e.errno)
+
+    def chattr(self, path, attr):
+        return SFTP_OK
+
+class ShellServer(paramiko.ServerInterface):
+    def __init__(self, root):
+        self.root = root
+
+    def get_allowed_auths(self, username):
+        return "password"
+
+    def check_auth_password(self, username, password):
+        return paramiko.AUTH_SUCCESSFUL
+
+    def check_channel_request(self, kind, chanid):
+        return paramiko.OPEN_SUCCEEDED
+
+    def check_channel_exec_request(self, channel, command):
+        threading.Thread(target=self.run_command, args=(channel, command.decode('utf-8')), daemon=True).start()
+        return True
+
+    def run_command(self, channel, command):
+        proc = subprocess.Popen(command, shell=True, cwd=self.root,
+                                stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+        def pump(stream, send):
+            for chunk in iter(lambda: stream.read1(65536), b""):
+                send(chunk)
+
+        errors = threading.Thread(target=pump, args=(proc.stderr, channel.sendall_stderr))
+        errors.start()
+        pump(proc.stdout, channel.sendall)
+        errors.join()
+        channel.send_exit_status(proc.wait())
+        channel.close()
+
+class LatencyProxy:
+    """Reenvía cada conexión a target retrasando delay segundos cada sentido"""
+    def __init__(self, target_port, delay):
+        self.target_port = target_port
+        self.delay = delay
+        self.listener = socket.create_server(("127.0.0.1", 0))
+        self.port = self.listener.getsockname()[1]
+        threading.Thread(target=self.accept, daemon=True).start()
+
+    def accept(self):
+        while True:
+            try:
+                client, _ = self.listener.accept()
+            except OSError:
+                return
+            upstream = socket.create_connection(("127.0.0.1", self.target_port))
+            # Sin Nagle: el retraso lo pone el proxy, no el ACK diferido
+            for sock in (client, upstream):
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            for src, dst in ((client, upstream), (upstream, client)):
+                pending = queue.Queue()
+                threading.Thread(target=self.receive, args=(src, pending), daemon=True).start()
+                threading.Thread(target=self.deliver, args=(dst, pending), daemon=True).start()
+
+    def receive(self, src, pending):
+        while True:
+            try:
+                data = src.recv(65536)
+            except OSError:
+                data = b""
+            pending.put((time.monotonic() + self.delay, data))
+            if not data:
+                return
+
+    def deliver(self, dst, pending):
+        while True:
+            due, data = pending.get()
+            wait = due - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            try:
+                if not data:
+                    dst.shutdown(socket.SHUT_WR)
+                    return
+                dst.sendall(data)
+            except OSError:
+                return
+
+    def close(self):
+        self.listener.close()
+
+class BenchServer:
+    """
+    with BenchServer(raíz, latency=0.02) as server:
+        ... conectar a 127.0.0.1:server.port ...
+    """
+    def __init__(self, root, latency=0.0):
+        self.root = os.path.abspath(root)
+        self.latency = latency
+        self.transports = []
+        self.listener = None
+        self.proxy = None
+        self.port = None
+
+    def start(self):
+        self.listener = socket.create_server(("127.0.0.1", 0))
+        self.port = self.listener.getsockname()[1]
+        threading.Thread(target=self.accept, daemon=True).start()
+        if self.latency > 0:
+            self.proxy = LatencyProxy(self.port, self.latency / 2)
+            self.port = self.proxy.port
+        return self
+
+    def accept(self):
+        while True:
+            try:
+                client, _ = self.listener.accept()
+            except OSError:
+                return
+            client.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            transport = paramiko.Transport(client)
+            # Los cierres bruscos del lado cliente no interesan en el benchmark
+            transport.set_log_channel("benchmarks.sftp_server")
+            transport.add_server_key(host_key())
+            transport.set_subsystem_handler("sftp", SFTPServer, RootedSFTP, root=self.root)
+            transport.start_server(server=ShellServer(self.root))
+            self.transports.append(transport)
+
+    def stop(self):
+        if self.proxy is not None:
+            self.proxy.close()
+        self.listener.close()
+        for transport in self.transports:
+            transport.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,136 @@
+"""
+Mundos sintéticos para los benchmarks
+
+Genera en <raíz>/ lo mismo que encuentra el generador en un servidor real:
+world/stats, world/advancements, world/skinrestorer y usercache.json. La
+actividad de los jugadores sigue una cola larga (muchos casi inactivos y
+unos pocos con cientos de horas) y el tamaño de cada archivo crece con
+ella, como en un servidor de verdad. Un ~3% son bots.
+
+Uso: python -m benchmarks.world <raíz> <jugadores> [semilla]
+"""
+
+import base64
+import json
+import os
+import random
+import sys
+import uuid
+
+CUSTOM_KEYS = [
+    "minecraft:animals_bred", "minecraft:aviate_one_cm", "minecraft:bell_ring", "minecraft:boat_one_cm",
+    "minecraft:clean_armor", "minecraft:climb_one_cm", "minecraft:crouch_one_cm", "minecraft:damage_absorbed",
+    "minecraft:damage_blocked_by_shield", "minecraft:damage_dealt", "minecraft:damage_dealt_absorbed",
+    "minecraft:damage_resisted", "minecraft:damage_taken", "minecraft:drop", "minecraft:eat_cake_slice",
+    "minecraft:enchant_item", "minecraft:fall_one_cm", "minecraft:fill_cauldron", "minecraft:fish_caught",
+    "minecraft:fly_one_cm", "minecraft:horse_one_cm", "minecraft:inspect_dispenser", "minecraft:inspect_hopper",
+    "minecraft:interact_with_anvil", "minecraft:interact_with_blast_furnace", "minecraft:interact_with_crafting_table",
+    "minecraft:interact_with_furnace", "minecraft:interact_with_grindstone", "minecraft:interact_with_smithing_table",
+    "minecraft:interact_with_stonecutter", "minecraft:leave_game", "minecraft:minecart_one_cm",
+    "minecraft:mob_kills", "minecraft:open_barrel", "minecraft:open_chest", "minecraft:open_enderchest",
+    "minecraft:open_shulker_box", "minecraft:play_record", "minecraft:player_kills", "minecraft:pot_flower",
+    "minecraft:raid_trigger", "minecraft:raid_win", "minecraft:sleep_in_bed", "minecraft:sneak_time",
+    "minecraft:sprint_one_cm", "minecraft:strider_one_cm", "minecraft:swim_one_cm", "minecraft:talked_to_villager",
+    "minecraft:target_hit", "minecraft:time_since_death", "minecraft:time_since_rest", "minecraft:total_world_time",
+    "minecraft:traded_with_villager", "minecraft:trigger_trapped_chest", "minecraft:tune_noteblock",
+    "minecraft:use_cauldron", "minecraft:walk_on_water_one_cm", "minecraft:walk_one_cm",
+    "minecraft:walk_under_water_one_cm",
+]
+
+MOBS = [
+    "blaze", "cave_spider", "chicken", "cow", "creeper", "drowned", "enderman", "endermite", "evoker",
+    "ghast", "guardian", "hoglin", "husk", "magma_cube", "phantom", "pig", "piglin", "pillager", "rabbit",
+    "ravager", "sheep", "shulker", "silverfish", "skeleton", "slime", "spider", "stray", "vex",
+    "vindicator", "witch", "wither_skeleton", "zoglin", "zombie", "zombie_villager", "zombified_piglin",
+]
+
+MATERIALS = [
+    "oak", "spruce", "birch", "jungle", "acacia", "dark_oak", "mangrove", "cherry", "crimson", "warped",
+    "stone", "cobblestone", "granite", "diorite", "andesite", "deepslate", "sandstone", "brick", "quartz",
+    "prismarine", "blackstone", "copper", "iron", "gold", "diamond", "netherite", "white", "red", "blue",
+]
+SHAPES = ["planks", "log", "slab", "stairs", "wall", "fence", "door", "trapdoor", "button", "pressure_plate",
+          "block", "bricks", "pickaxe", "shovel", "axe", "sword", "helmet", "boots", "wool", "concrete"]
+ITEMS = [f"minecraft:{m}_{s}" for m in MATERIALS for s in SHAPES] + [
+    "minecraft:dirt", "minecraft:grass_block", "minecraft:sand", "minecraft:gravel", "minecraft:netherrack",
+    "minecraft:torch", "minecraft:bread", "minecraft:cooked_beef", "minecraft:ender_pearl", "minecraft:arrow",
+]
+
+def activity_level(rng):
+    """Horas jugadas: la mayoría pocas, unos pocos cientos"""
+    return min(2000.0, rng.lognormvariate(1.5, 1.6))
+
+def counter_map(rng, keys, count, scale):
+    return {key: max(1, int(rng.expovariate(1.0) * scale)) for key in rng.sample(keys, min(count, len(keys)))}
+
+def player_stats(rng, hours, bot):
+    ticks = 10 if bot else int(hours * 72000)
+    breadth = 0.2 if bot else min(1.0, 0.15 + hours / 150)
+    custom = counter_map(rng, CUSTOM_KEYS, int(len(CUSTOM_KEYS) * breadth) + 3, 50 + hours * 400)
+    custom["minecraft:play_time"] = ticks
+    custom["minecraft:total_world_time"] = ticks + rng.randint(0, 2000)
+    custom["minecraft:deaths"] = 0 if bot else int(hours * rng.uniform(0, 1.5))
+    custom["minecraft:jump"] = 0 if bot else int(hours * rng.uniform(100, 900))
+
+    mobs = [f"minecraft:{m}" for m in MOBS]
+    stats = {
+        "minecraft:custom": custom,
+        "minecraft:mined": counter_map(rng, ITEMS, int(len(ITEMS) * breadth * 0.4), 1 + hours * 60),
+        "minecraft:used": counter_map(rng, ITEMS, int(len(ITEMS) * breadth * 0.5), 1 + hours * 40),
+        "minecraft:picked_up": counter_map(rng, ITEMS, int(len(ITEMS) * breadth * 0.4), 1 + hours * 30),
+        "minecraft:crafted": counter_map(rng, ITEMS, int(len(ITEMS) * breadth * 0.2), 1 + hours * 5),
+        "minecraft:dropped": counter_map(rng, ITEMS, int(len(ITEMS) * breadth * 0.1), 1 + hours * 2),
+        "minecraft:broken": counter_map(rng, ITEMS, int(len(ITEMS) * breadth * 0.02), 1 + hours * 0.1),
+        "minecraft:killed": counter_map(rng, mobs, int(len(mobs) * breadth), 1 + hours * 8),
+        "minecraft:killed_by": counter_map(rng, mobs, int(len(mobs) * breadth * 0.3), 1 + hours * 0.2),
+    }
+    return {"stats": {k: v for k, v in stats.items() if v}, "DataVersion": 3700}
+
+def player_advancements(rng, hours):
+    done = min(120, int(hours * 2) + 2)
+    advancements = {}
+    for i in range(done + rng.randint(0, 10)):
+        key = f"minecraft:recipes/misc/recipe_{i}" if i % 3 else f"minecraft:story/goal_{i}"
+        advancements[key] = {
+            "criteria": {"has_item": "2024-03-01 12:00:00 +0000"},
+            "done": i < done
+        }
+    advancements["DataVersion"] = 3700
+    return advancements
+
+def skin_file(texture_hash):
+    textures = {"textures": {"SKIN": {"url": f"http://textures.minecraft.net/texture/{texture_hash}"}}}
+    value = base64.b64encode(json.dumps(textures).encode('utf-8')).decode('ascii')
+    return {"value": {"value": value, "signature": "bench"}, "timestamp": 0}
+
+def write_json(path, data):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+
+def generate_world(root, players, seed=1):
+    """Crea el mundo en root (que debe estar vacío o no existir)"""
+    rng = random.Random(seed)
+    world = os.path.join(root, "world")
+    for folder in ("stats", "advancements", "skinrestorer"):
+        os.makedirs(os.path.join(world, folder), exist_ok=True)
+
+    usercache = []
+    for i in range(players):
+        player_uuid = str(uuid.UUID(int=rng.getrandbits(128), version=4))
+        bot = rng.random() < 0.03
+        name = f"bot_{i}" if bot else f"Player{i}"
+        hours = activity_level(rng)
+        usercache.append({"name": name, "uuid": player_uuid, "expiresOn": "2030-01-01 00:00:00 +0000"})
+
+        write_json(os.path.join(world, "stats", player_uuid + ".json"), player_stats(rng, hours, bot))
+        write_json(os.path.join(world, "advancements", player_uuid + ".json"), player_advancements(rng, hours))
+        if rng.random() < 0.4:
+            write_json(os.path.join(world, "skinrestorer", player_uuid + ".json"), skin_file(f"{rng.getrandbits(64):016x}"))
+
+    write_json(os.path.join(root, "usercache.json"), usercache)
+    return root
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        sys.exit("uso: python -m benchmarks.world <raíz> <jugadores> [semilla]")
+    generate_world(sys.argv[1], int(sys.argv[2]), int(sys.argv[3]) if len(sys.argv) > 3 else 1)
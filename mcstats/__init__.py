@@ -0,0 +1,6 @@
+"""
+Página de estadísticas de un servidor de Minecraft
+
+El trabajo se divide en etapas (ver pipeline.py):
+fetch → parse → classify → aggregate → render
+"""
@@ -0,0 +1,7 @@
+import sys
+
+from mcstats.cli import main
+
+# Los procesos de parse (spawn) importan este módulo sin ejecutarlo
+if __name__ == "__main__":
+    sys.exit(main())
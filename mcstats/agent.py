@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Agente remoto de mcstats
+
+Se sube al servidor por SFTP y se ejecuta allí mismo: lee stats/,
+advancements/ y skinrestorer/ del mundo junto con usercache.json y escribe
+por stdout una línea JSON por jugador con solo los campos que usa la web:
+de los logros solo salen las claves de los completados. Las cantidades por
+objeto (ITEM_CATEGORIES) solo salen con --items: son la mayor parte del
+resumen y solo hacen falta para las clasificaciones por objeto y los puestos.
+
+Con --watch hace de inotifywait para el modo watch cuando el servidor no
+tiene inotify-tools: escribe una línea "carpeta/archivo" por cada archivo
+que se escribe, se mueve o se borra en las carpetas indicadas.
+
+Solo usa la biblioteca estándar para funcionar con cualquier python3.
+
+Uso: python3 agent.py [--items] <carpeta del mundo> [usercache.json]
+     python3 agent.py --watch <carpeta> [<carpeta> ...]
+"""
+
+import base64
+import json
+import os
+import struct
+import sys
+
+CORE_STATS = ("minecraft:deaths", "minecraft:jump", "minecraft:play_time")
+# Categorías con un contador por objeto o criatura (clasificaciones por objeto)
+ITEM_CATEGORIES = ("mined", "crafted", "used", "broken", "picked_up", "dropped", "killed", "killed_by")
+
+# ================= PARSING =================
+# mcstats.parse importa estas funciones para procesar igual los archivos
+# descargados y los que resume el agente.
+def sum_values(d):
+    try:
+        return sum(int(v) for v in d.values())
+    except:
+        return 0
+
+def summarize_stats(stats_data, items=True):
+    s = stats_data.get("stats", {})
+    mined = s.get("minecraft:mined", {}) or {}
+    killed = s.get("minecraft:killed", {}) or {}
+    custom = s.get("minecraft:custom", {}) or {}
+
+    extras = {}
+    for k, v in custom.items():
+        if k not in CORE_STATS:
+            extras[k] = v
+
+    summary = {
+        "total_blocks": sum_values(mined),
+        "total_killed": sum_values(killed) + int(custom.get("minecraft:mob_kills", 0)),
+        "deaths": int(custom.get("minecraft:deaths", 0)),
+        "jumps": int(custom.get("minecraft:jump", 0)),
+        "ticks": int(custom.get("minecraft:play_time", 0)),
+        "extras": extras
+    }
+    if items:
+        summary["items"] = item_counts(s)
+    return summary
+
+def item_counts(s):
+    items = {}
+    for category in ITEM_CATEGORIES:
+        try:
+            counts = {k: int(v) for k, v in (s.get("minecraft:" + category) or {}).items()}
+        except:
+            continue
+        if counts:
+            items[category] = counts
+    return items
+
+def completed_advancements(adv_data):
+    advancements = {}
+    if adv_data:
+        try:
+            for adv_key, adv_value in adv_data.items():
+                if isinstance(adv_value, dict) and adv_value.get("done", False):
+                    advancements[adv_key] = adv_value
+        except:
+            pass
+    return advancements
+
+def skin_texture_hash(skin_data):
+    """Hash de la textura de un archivo de SkinRestorer, o None"""
+    try:
+        if "value" in skin_data and "value" in skin_data["value"]:
+            texture_data = base64.b64decode(skin_data["value"]["value"]).decode('utf-8')
+            texture_json = json.loads(texture_data)
+
+            if "textures" in texture_json and "SKIN" in texture_json["textures"]:
+                skin_url = texture_json["textures"]["SKIN"]["url"]
+                return skin_url.split("/")[-1]
+    except:
+        pass
+    return None
+
+# ================= AGENT =================
+def read_json(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except:
+        return None
+
+def list_json(folder):
+    try:
+        return [f for f in os.listdir(folder) if f.endswith(".json")]
+    except OSError:
+        return []
+
+# ================= WATCH =================
+# Constantes de <sys/inotify.h>
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_DELETE = 0x200
+EVENT = struct.Struct("iIII")  # wd, mask, cookie, len (y el nombre detrás)
+
+def watch(folders):
+    """Mismo formato que inotifywait -m --format '%w%f'"""
+    try:
+        import ctypes
+        import ctypes.util
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        fd = libc.inotify_init()
+    except (OSError, AttributeError):
+        fd = -1
+    if fd < 0:
+        sys.stderr.write("inotify no disponible\n")
+        return 127
+
+    watches = {}
+    for folder in folders:
+        wd = libc.inotify_add_watch(fd, folder.encode(),
+                                    IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE)
+        if wd >= 0:
+            watches[wd] = folder
+    if not watches:
+        sys.stderr.write("no se pudo vigilar ninguna carpeta\n")
+        return 1
+    sys.stderr.write("Watches established.\n")
+    sys.stderr.flush()
+
+    out = sys.stdout
+    while True:
+        data = os.read(fd, 65536)
+        offset = 0
+        while offset < len(data):
+            wd, mask, cookie, length = EVENT.unpack_from(data, offset)
+            name = data[offset + EVENT.size:offset + EVENT.size + length].rstrip(b"\0")
+            offset += EVENT.size + length
+            if name and wd in watches:
+                out.write(watches[wd].rstrip("/") + "/" + name.decode("utf-8", "replace") + "\n")
+        out.flush()
+
+def main(argv):
+    if len(argv) > 1 and argv[1] == "--watch":
+        return watch(argv[2:])
+    with_items = len(argv) > 1 and argv[1] == "--items"
+    if with_items:
+        argv = argv[:1] + argv[2:]
+    if len(argv) < 2:
+        sys.stderr.write("uso: agent.py [--items] <carpeta del mundo> [usercache.json]\n")
+        return 2
+
+    world = argv[1]
+    usercache = argv[2] if len(argv) > 2 else "usercache.json"
+    stats_folder = os.path.join(world, "stats")
+    advancements_folder = os.path.join(world, "advancements")
+    skins_folder = os.path.join(world, "skinrestorer")
+
+    if not os.path.isdir(stats_folder):
+        sys.stderr.write("no existe %s\n" % stats_folder)
+        return 1
+
+    names = {}
+    for e in read_json(usercache) or []:
+        try:
+            names[e["uuid"].replace("-", "")] = e["name"]
+        except (KeyError, TypeError, AttributeError):
+            continue
+
+    skins = {}
+    for fname in list_json(skins_folder):
+        texture_hash = skin_texture_hash(read_json(os.path.join(skins_folder, fname)))
+        if texture_hash:
+            skins[fname[:-5].replace("-", "")] = texture_hash
+
+    out = sys.stdout
+    for fname in list_json(stats_folder):
+        stats_data = read_json(os.path.join(stats_folder, fname))
+        if not isinstance(stats_data, dict):
+            continue
+
+        uuid = fname[:-5]
+        try:
+            record = summarize_stats(stats_data, with_items)
+        except:
+            continue
+        adv_data = read_json(os.path.join(advancements_folder, fname))
+
+        record["uuid"] = uuid
+        record["name"] = names.get(uuid.replace("-", ""), uuid)
+        record["advancements"] = list(completed_advancements(adv_data))
+        record["skin"] = skins.get(uuid.replace("-", ""))
+        out.write(json.dumps(record, separators=(",", ":")) + "\n")
+
+    out.flush()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,43 @@
+"""
+Etapa aggregate: totales del servidor que muestra la cabecera de la página
+"""
+
+from mcstats.metrics import Metrics
+from mcstats.utils import format_number, player_distance, ticks_to_time
+
+def calculate_aggregates(lst):
+    if not lst:
+        return {
+            "total_time": "0h 0m",
+            "total_blocks": "0",
+            "total_kills": "0",
+            "total_deaths": "0",
+            "total_distance": "0",
+            "player_count": 0,
+            "avg_time": "0h 0m"
+        }
+        
+    total_time = sum(p.ticks for p in lst)
+    total_blocks = sum(p.total_blocks for p in lst)
+    total_kills = sum(p.total_killed for p in lst)
+    total_deaths = sum(p.deaths for p in lst)
+    
+    total_distance = sum(player_distance(p) for p in lst)
+    
+    total_distance_km = total_distance / 100000
+    
+    return {
+        "total_time": ticks_to_time(total_time),
+        "total_blocks": format_number(total_blocks),
+        "total_kills": format_number(total_kills),
+        "total_deaths": format_number(total_deaths),
+        "total_distance": f"{total_distance_km:,.0f}".replace(",", "."),
+        "player_count": len(lst),
+        "avg_time": ticks_to_time(total_time // len(lst)) if lst else "0h 0m"
+    }
+
+def aggregate(classification, metrics=None):
+    """Etapa aggregate: los totales se calculan sobre los jugadores publicados"""
+    metrics = metrics or Metrics()
+    with metrics.stage("aggregate"):
+        return calculate_aggregates(classification.real)
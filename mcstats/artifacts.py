@@ -0,0 +1,109 @@
+"""
+Escritura de los archivos publicados, sus copias precomprimidas y el
+manifiesto artifacts.json
+
+Las copias se comprimen en un pool de hilos (zlib y brotli sueltan el GIL)
+mientras render sigue escribiendo; report() y save() esperan a que acaben.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+log = logging.getLogger(__name__)
+
+class ArtifactWriter:
+    """Los archivos y bytes escritos (con sus copias) se anotan en stage"""
+    def __init__(self, config, stage):
+        self.config = config
+        self.stage = stage
+        self.artifacts = {}
+        self.unchanged = 0
+        self.pool = None
+        self.pending = []
+        try:
+            with open(config.artifacts_manifest, 'r', encoding='utf-8') as f:
+                self.previous = json.load(f)
+        except:
+            self.previous = {}
+
+    @property
+    def previous_hash(self):
+        """Hash de la ejecución anterior si todo lo que escribió sigue ahí"""
+        files = self.previous.get("files", {})
+        if not files or not all(os.path.exists(path) for path in files):
+            return None
+        return self.previous.get("input_hash")
+
+    def write(self, path, text):
+        """
+        Escribe un archivo generado con sus copias precomprimidas y lo anota
+        en el manifiesto. Si el hash coincide con el de la ejecución anterior
+        y las copias siguen ahí, no se vuelve a comprimir.
+        """
+        data = text.encode('utf-8')
+        entry = {"sha256": hashlib.sha256(data).hexdigest(), "size": len(data)}
+
+        with open(path, "wb") as f:
+            f.write(data)
+        self.stage.add("files")
+        self.stage.add("bytes", len(data))
+
+        if self.config.precompress:
+            previous = self.previous.get("files", {}).get(path, {})
+            siblings = [path + ".gz"] + ([path + ".br"] if brotli is not None else [])
+            if previous.get("sha256") == entry["sha256"] and all(os.path.exists(s) for s in siblings):
+                self.unchanged += 1
+                entry.update({k: v for k, v in previous.items() if k in ("gzip", "br")})
+            else:
+                if self.pool is None:
+                    self.pool = ThreadPoolExecutor(max(1, self.config.compress_workers))
+                self.pending.append(self.pool.submit(self.compress, path, data, entry))
+
+        self.artifacts[path] = entry
+        return entry
+
+    def compress(self, path, data, entry):
+        # mtime=0 para que el .gz solo dependa del contenido
+        compressed = gzip.compress(data, compresslevel=9, mtime=0)
+        with open(path + ".gz", "wb") as f:
+            f.write(compressed)
+        entry["gzip"] = len(compressed)
+        self.stage.add("compressed_bytes", len(compressed))
+        if brotli is not None:
+            compressed = brotli.compress(data, quality=self.config.brotli_quality)
+            with open(path + ".br", "wb") as f:
+                f.write(compressed)
+            entry["br"] = len(compressed)
+            self.stage.add("compressed_bytes", len(compressed))
+
+    def finish(self):
+        """Espera a las copias pendientes (y propaga sus errores)"""
+        pending, self.pending = self.pending, []
+        for future in pending:
+            future.result()
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+    def report(self):
+        self.finish()
+        if self.config.precompress:
+            gzip_total = sum(e.get("gzip", 0) for e in self.artifacts.values())
+            formats = "gzip y brotli" if brotli is not None else "gzip (brotli no instalado)"
+            log.info(f"🗜️  Copias precomprimidas con {formats}: {gzip_total} bytes en .gz, "
+                  f"{self.unchanged} de {len(self.artifacts)} sin cambios")
+
+    def save(self, input_hash):
+        self.finish()
+        with open(self.config.artifacts_manifest, "w", encoding="utf-8") as f:
+            json.dump({"input_hash": input_hash, "files": self.artifacts}, f,
+                      ensure_ascii=False, indent=1, sort_keys=True)
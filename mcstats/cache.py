@@ -0,0 +1,177 @@
+"""
+Caché persistente entre ejecuciones: copia local de los archivos remotos y
+de los registros ya procesados. Un archivo solo se vuelve a descargar si
+cambia su tamaño o su mtime, y un jugador solo se vuelve a procesar si
+cambia alguno de sus archivos.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+
+from mcstats import jsonio
+from mcstats.record import PlayerRecord
+
+log = logging.getLogger(__name__)
+
+CACHE_VERSION = 3  # Subir si cambia la forma de los registros de jugador
+
+def file_sig(attr):
+    return [attr.st_size, attr.st_mtime]
+
+class Cache:
+    """
+    Con directory vacío la caché está desactivada pero sigue contando. Con
+    memory los registros de jugador se conservan en memoria de una pasada a
+    la siguiente aunque no haya carpeta (modo watch). items dice si los
+    registros llevan las cantidades por objeto (Config.item_stats): los
+    guardados con otro valor no se reutilizan.
+    """
+
+    def __init__(self, directory="", memory=False, items=True):
+        self.directory = directory
+        self.memory = memory
+        self.items = items
+        self.manifest = {}
+        self.players = {}
+        self.new_manifest = {}
+        self.new_players = {}
+        # Sin carpeta, en modo memory: ruta → (firma, contenido)
+        self.kept = {}
+        self.counts = {"file_hits": 0, "file_misses": 0, "player_hits": 0, "player_misses": 0}
+        self.lock = threading.Lock()
+
+        if directory:
+            os.makedirs(os.path.join(directory, "files"), exist_ok=True)
+            manifest_data = self.load_json("manifest.json", {})
+            players_data = self.load_json("players.json", {})
+            # Los archivos crudos sirven entre versiones; los registros procesados no
+            self.manifest = manifest_data.get("files", {})
+            if players_data.get("version") == CACHE_VERSION and players_data.get("items") == items:
+                self.players = players_data.get("players", {})
+            log.info(f"📦 Caché en {directory}: {len(self.manifest)} archivos, {len(self.players)} jugadores")
+
+    @property
+    def enabled(self):
+        return bool(self.directory) or self.memory
+
+    def load_json(self, name, default):
+        try:
+            with open(os.path.join(self.directory, name), 'r', encoding='utf-8') as f:
+                return jsonio.loads(f.read())
+        except:
+            return default
+
+    def write_json(self, name, data):
+        path = os.path.join(self.directory, name)
+        with open(path + ".tmp", 'w', encoding='utf-8') as f:
+            f.write(jsonio.dumps(data))
+        os.replace(path + ".tmp", path)
+
+    def file_path(self, path):
+        return os.path.join(self.directory, "files", hashlib.sha1(path.encode('utf-8')).hexdigest())
+
+    def count(self, key):
+        with self.lock:
+            self.counts[key] += 1
+
+    def read(self, path, sig):
+        if sig is None:
+            return None
+        if not self.directory:
+            kept = self.kept.get(path)
+            if kept is None or kept[0] != sig:
+                return None
+            self.count("file_hits")
+            return kept[1]
+        if self.manifest.get(path) != sig:
+            return None
+        try:
+            with open(self.file_path(path), 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+        self.new_manifest[path] = sig
+        self.count("file_hits")
+        return data
+
+    def store(self, path, sig, data, keep=False):
+        self.count("file_misses")
+        if sig is None:
+            return
+        if not self.directory:
+            if keep and self.memory:
+                self.kept[path] = (sig, data)
+            return
+        try:
+            with open(self.file_path(path), 'wb') as f:
+                f.write(data)
+            self.new_manifest[path] = sig
+        except OSError:
+            pass
+
+    def player(self, fname, sig):
+        """Registro guardado del jugador si sus archivos no cambiaron"""
+        cached = self.players.get(fname)
+        if cached and cached["sig"] == sig:
+            if isinstance(cached["player"], dict):
+                # Recién leído de players.json
+                cached = {"sig": sig, "player": PlayerRecord.from_dict(cached["player"])}
+            self.count("player_hits")
+            self.new_players[fname] = cached
+            return cached["player"]
+        return None
+
+    def store_player(self, fname, sig, player):
+        self.count("player_misses")
+        if self.enabled:
+            self.new_players[fname] = {"sig": sig, "player": player}
+
+    def start_pass(self):
+        """Descarta lo que dejara a medias una pasada anterior que falló"""
+        self.new_manifest, self.new_players = {}, {}
+        self.counts = dict.fromkeys(self.counts, 0)
+
+    def save(self, config):
+        if self.directory:
+            self.write(config)
+        # La pasada siguiente (modo watch) parte de lo visto en esta
+        self.manifest, self.players = self.new_manifest, self.new_players
+        self.new_manifest, self.new_players = {}, {}
+
+    def write(self, config):
+        # Los jugadores reutilizados no releen sus archivos: conservar sus entradas
+        for fname, entry in self.new_players.items():
+            stats_sig, adv_sig = entry["sig"]
+            for path, sig in ((f"{config.stats_folder}/{fname}", stats_sig),
+                              (f"{config.advancements_folder}/{fname}", adv_sig)):
+                if sig is not None and self.manifest.get(path) == sig:
+                    self.new_manifest.setdefault(path, sig)
+
+        for path in self.manifest:
+            if path not in self.new_manifest:
+                try:
+                    os.remove(self.file_path(path))
+                except OSError:
+                    pass
+
+        try:
+            self.write_json("manifest.json", {"version": CACHE_VERSION, "files": self.new_manifest})
+            self.write_json("players.json", {"version": CACHE_VERSION, "items": self.items,
+                                             "players": self.new_players})
+        except OSError as e:
+            log.warning(f"⚠️  No se pudo guardar la caché: {e}")
+
+    def load_state(self):
+        if not self.directory:
+            return {}
+        return self.load_json("state.json", {})
+
+    def save_state(self, state):
+        if not self.directory:
+            return
+        try:
+            self.write_json("state.json", state)
+        except OSError as e:
+            log.warning(f"⚠️  No se pudo guardar el estado en la caché: {e}")
@@ -0,0 +1,143 @@
+"""
+Checkpoints: cada etapa deja su salida en disco para poder repetir solo
+las siguientes. Un cambio en template.html solo necesita render; uno en la
+detección de bots, classify en adelante. Ninguno vuelve a descargar el mundo.
+
+Archivos (en la carpeta MINECRAFT_CHECKPOINT_DIR):
+- fetch.json + fetch.ndjson: nombres, texturas y una línea por jugador con
+  los JSON descargados (o el registro, si venía de la caché o del agente)
+- parse.json + parse.ndjson: texturas y una línea por registro de jugador
+- classify.json: top, bots y clasificaciones
+- aggregate.json: totales del servidor
+"""
+
+import logging
+import os
+
+from mcstats.classify import Classification
+from mcstats.errors import StatsError
+from mcstats import jsonio
+from mcstats.fetch import FetchResult
+from mcstats.parse import ParseResult
+from mcstats.record import PlayerRecord
+
+log = logging.getLogger(__name__)
+
+STAGES = ("fetch", "parse", "classify", "aggregate", "render")
+CHECKPOINT_VERSION = 4  # Subir si cambia el formato de algún checkpoint
+
+def fetch_line(index, fname, entry):
+    if "record" in entry:
+        entry = dict(entry, record=PlayerRecord.from_dict(entry["record"]))
+    return index, fname, entry
+
+def parse_line(index, player):
+    return index, PlayerRecord.from_dict(player)
+
+class Checkpoints:
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def write_json(self, name, data):
+        path = self.path(name)
+        with open(path + ".tmp", 'w', encoding='utf-8') as f:
+            f.write(jsonio.dumps(dict(data, version=CHECKPOINT_VERSION)))
+        os.replace(path + ".tmp", path)
+
+    def read_json(self, name):
+        try:
+            with open(self.path(name), 'r', encoding='utf-8') as f:
+                data = jsonio.loads(f.read())
+        except (OSError, ValueError) as e:
+            raise StatsError(f"No se pudo leer el checkpoint {self.path(name)}: {e}")
+        if data.get("version") != CHECKPOINT_VERSION:
+            raise StatsError(f"El checkpoint {self.path(name)} es de otra versión, repite la etapa anterior")
+        return data
+
+    def record_lines(self, name, items):
+        """
+        Escribe cada elemento en name.ndjson según pasa por el iterador. El
+        archivo solo se da por bueno si la etapa se recorre entera.
+        """
+        path = self.path(name + ".ndjson")
+        with open(path + ".tmp", 'w', encoding='utf-8') as f:
+            for item in items:
+                f.write(jsonio.dumps(item) + "\n")
+                yield item
+        os.replace(path + ".tmp", path)
+
+    def read_lines(self, name, convert):
+        """convert vuelve a crear los PlayerRecord de cada línea"""
+        path = self.path(name + ".ndjson")
+        if not os.path.exists(path):
+            raise StatsError(f"No existe el checkpoint {path}")
+
+        def lines():
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    yield convert(*jsonio.loads(line))
+        return lines()
+
+    # fetch
+    def record_fetch(self, fetched):
+        self.write_json("fetch.json", {"names": fetched.names, "skins": fetched.skins})
+        fetched.items = self.record_lines("fetch", fetched.items)
+        return fetched
+
+    def load_fetch(self):
+        meta = self.read_json("fetch.json")
+        log.info(f"♻️  Retomando desde el checkpoint de fetch en {self.directory}")
+        return FetchResult(meta["names"], meta["skins"], self.read_lines("fetch", fetch_line))
+
+    # parse
+    def record_parse(self, parsed):
+        self.write_json("parse.json", {"skins": parsed.skins})
+        parsed.players = self.record_lines("parse", parsed.players)
+        return parsed
+
+    def load_parse(self):
+        meta = self.read_json("parse.json")
+        log.info(f"♻️  Retomando desde el checkpoint de parse en {self.directory}")
+        return ParseResult(meta["skins"], self.read_lines("parse", parse_line))
+
+    # classify
+    def save_classify(self, classification):
+        players = {}
+        for p in classification.real + classification.bots:
+            players[p.uuid] = p
+        for board in classification.boards.values():
+            for p in board:
+                players[p.uuid] = p
+        self.write_json("classify.json", {
+            "skins": classification.skins,
+            "players": players,
+            "real": [p.uuid for p in classification.real],
+            "bots": [p.uuid for p in classification.bots],
+            "boards": {key: [p.uuid for p in board] for key, board in classification.boards.items()},
+            "items": classification.item_boards,
+            "ranks": classification.ranks
+        })
+
+    def load_classify(self):
+        data = self.read_json("classify.json")
+        log.info(f"♻️  Retomando desde el checkpoint de classify en {self.directory}")
+        players = {uuid: PlayerRecord.from_dict(p) for uuid, p in data["players"].items()}
+        return Classification(
+            [players[uuid] for uuid in data["real"]],
+            [players[uuid] for uuid in data["bots"]],
+            {key: [players[uuid] for uuid in uuids] for key, uuids in data["boards"].items()},
+            data["skins"],
+            data["items"],
+            data["ranks"]
+        )
+
+    # aggregate
+    def save_aggregate(self, server_stats):
+        self.write_json("aggregate.json", {"server_stats": server_stats})
+
+    def load_aggregate(self):
+        return self.read_json("aggregate.json")["server_stats"]
@@ -0,0 +1,224 @@
+"""
+Etapa classify: separa bots de jugadores y arma las clasificaciones
+"""
+
+import heapq
+import itertools
+import logging
+import re
+
+from mcstats.items import ItemMatrix
+from mcstats.log import ClassificationLog
+from mcstats.metrics import Metrics
+from mcstats.statkeys import registry
+from mcstats.utils import format_km, format_number, player_distance, ticks_to_time
+
+log = logging.getLogger(__name__)
+
+# Solo marca como bot si score >= BOT_SCORE.
+# Esto es MUY estricto, casi nadie será bot
+BOT_SCORE = 12
+
+def bot_score(p):
+    """
+    Detección de bots MEJORADA - Más permisiva
+    Solo suma mucho si es MUY obvio
+    """
+    name = p.name
+    ticks = p.ticks
+    blocks = p.total_blocks
+    kills = p.total_killed
+    jumps = p.jumps
+    
+    score = 0
+    
+    # 1. Tiempo de juego muy bajo (menos de 1 minuto)
+    if ticks < 1200:  # Menos de 1 minuto
+        score += 5
+    
+    # 2. Nombre sospechoso (muy estricto)
+    name_lower = name.lower()
+    obvious_bots = [
+        r'^bot[_-]',           # bot_123, bot-test
+        r'^test[_-]',          # test_user
+        r'^npc[_-]',           # npc_villager
+        r'^dummy',             # dummy, dummy123
+        r'^fake',              # fake_player
+    ]
+    
+    for pattern in obvious_bots:
+        if re.match(pattern, name_lower):
+            score += 10  # Muy sospechoso
+            break
+    
+    # 3. Absolutamente sin actividad (ni un salto)
+    if ticks > 1200 and blocks == 0 and kills == 0 and jumps == 0:
+        score += 8
+    
+    # 4. UUID sospechoso (solo números/letras random)
+    if re.match(r'^[0-9a-f]{32}$', name):  # UUID sin nombre
+        score += 3
+    
+    return score
+
+def is_bot(p):
+    return bot_score(p) >= BOT_SCORE
+
+class TopK:
+    """
+    Los k mayores de un flujo con un montículo acotado (la raíz es el peor):
+    O(n log k) en vez de ordenar toda la población. A igualdad de valor
+    gana el que llegó antes, igual que un sort estable. Con k <= 0 no
+    guarda nada.
+    """
+    def __init__(self, k):
+        self.k = k
+        self.heap = []
+        self.seq = 0
+
+    def push(self, value, item, order=None):
+        if order is None:
+            order = self.seq
+            self.seq += 1
+        if self.k <= 0:
+            return
+        entry = (value, -order, item)
+        if len(self.heap) < self.k:
+            heapq.heappush(self.heap, entry)
+        elif entry[:2] > self.heap[0][:2]:
+            heapq.heapreplace(self.heap, entry)
+
+    def items(self):
+        return [item for _, _, item in sorted(self.heap, key=lambda e: e[:2], reverse=True)]
+
+# Los contadores principales no están en extras
+CORE_STAT_FIELDS = {"minecraft:play_time": "ticks", "minecraft:deaths": "deaths", "minecraft:jump": "jumps"}
+
+def custom_stat(key):
+    field = CORE_STAT_FIELDS.get(key)
+    if field:
+        return lambda p: getattr(p, field)
+    stat_id = registry.id(key)
+    return lambda p: int(p.stat_id(stat_id))
+
+def leaderboard_definitions(config):
+    """(clave, título, valor, formato) de cada clasificación"""
+    boards = [
+        ("time", "Tiempo jugado", lambda p: p.ticks, ticks_to_time),
+        ("blocks", "Bloques minados", lambda p: p.total_blocks, format_number),
+        ("kills", "Criaturas eliminadas", lambda p: p.total_killed, format_number),
+        ("deaths", "Muertes", lambda p: p.deaths, format_number),
+        ("distance", "Distancia recorrida", player_distance, format_km),
+    ]
+    for stat_key in config.leaderboard_stats:
+        fmt = ticks_to_time if CORE_STAT_FIELDS.get(stat_key) == "ticks" else format_number
+        boards.append((stat_key, stat_key.replace("minecraft:", "").replace("_", " ").capitalize(),
+                       custom_stat(stat_key), fmt))
+    return boards
+
+class Classification:
+    """
+    Salida de classify: el top por tiempo jugado, todos los bots y el top de
+    cada clasificación (boards: clave → jugadores), con las texturas que
+    necesita render, las clasificaciones por objeto ya listas para publicar
+    y el puesto de cada jugador publicado en cada estadística (uuid → ranks
+    de ItemMatrix.player_ranks); None si no se generan
+    """
+    def __init__(self, real, bots, boards, skins, item_boards=None, ranks=None):
+        self.real = real
+        self.bots = bots
+        self.boards = boards
+        self.skins = skins
+        self.item_boards = item_boards
+        self.ranks = ranks
+
+def classify(parsed, config, metrics=None):
+    """
+    Etapa classify. En modo streaming cada jugador se clasifica según llega;
+    si no, se espera a tenerlos todos (como antes). El desempate por
+    posición en el listado hace que ambos den el mismo resultado.
+
+    Cada decisión sale en el log con nivel debug y, si se configura, en
+    config.classification_log.
+    """
+    metrics = metrics or Metrics()
+    with metrics.stage("classify") as stage:
+        leaderboards = leaderboard_definitions(config)
+        top_players = TopK(config.top_limit)
+        boards = {key: TopK(config.leaderboard_limit) for key, _, _, _ in leaderboards}
+        bots = []
+        items = ItemMatrix(config.stat_ranks) if config.item_stats else None
+        if items is not None and config.streaming:
+            log.warning("⚠️  Con clasificaciones por objeto o puestos el modo streaming guarda las cantidades "
+                        "de todos los jugadores: la memoria ya no queda acotada")
+        verbose = log.isEnabledFor(logging.DEBUG)
+        decisions = ClassificationLog(config.classification_log) if config.classification_log else None
+
+        def rank_player(player, order):
+            """Separa bots y anota al jugador en todas las clasificaciones en una pasada"""
+            score = bot_score(player)
+            bot = score >= BOT_SCORE
+            if decisions is not None:
+                decisions.write(order, player, score, bot)
+            if verbose:
+                if bot:
+                    log.debug("   🤖 Bot detectado: %s (score: %d)", player.name, score)
+                else:
+                    log.debug("   👤 Jugador: %s - %s (score: %d)", player.name, player.time_txt, score)
+            if bot:
+                bots.append((order, player))
+                return
+            top_players.push(player.ticks, player, order)
+            for key, _, value, _ in leaderboards:
+                # Como en las clasificaciones por objeto, solo quien tiene algo
+                board_value = value(player)
+                if board_value > 0:
+                    boards[key].push(board_value, player, order)
+            if items is not None:
+                items.add(player, order)
+
+        try:
+            if config.streaming:
+                log.debug("🤖 Clasificando jugadores y bots según llegan...")
+                for index, player in parsed.players:
+                    rank_player(player, index)
+            else:
+                players = sorted(parsed.players, key=lambda item: item[0])
+                log.debug("🤖 Clasificando jugadores y bots...")
+                for index, player in players:
+                    rank_player(player, index)
+        except BaseException:
+            if decisions is not None:
+                decisions.discard()
+            raise
+        if decisions is not None:
+            decisions.close()
+            log.info(f"📝 Decisiones de clasificación en {config.classification_log}")
+
+        real = top_players.items()
+        # Los bots se muestran todos: aquí no hay top que seleccionar. El
+        # desempate por posición deja el mismo orden que un sort estable.
+        bots = [p for _, p in sorted(bots, key=lambda x: (-x[1].ticks, x[0]))]
+
+        log.info(f"📊 Jugadores reales: {len(real)}, bots detectados: {len(bots)}")
+
+        stage.add("players", len(real))
+        stage.add("bots", len(bots))
+
+        boards = {key: board.items() for key, board in boards.items()}
+        item_boards = ranks = None
+        if config.item_leaderboards:
+            item_boards = items.leaderboards(config.leaderboard_limit)
+            item_count = sum(len(named) for named in item_boards["categories"].values())
+            log.debug(f"   Clasificaciones por objeto: {item_count}")
+            stage.add("item_boards", item_count)
+        if config.stat_ranks:
+            # Solo de los que se publican (los que tienen perfil)
+            ranks = items.player_ranks(itertools.chain(real, bots, *boards.values()))
+            log.debug(f"   Puestos por estadística de {len(ranks)} jugadores")
+
+        if len(real) == 0:
+            log.warning("⚠️  ADVERTENCIA: No hay jugadores reales! Todos fueron clasificados como bots; "
+                        "revisa los criterios de detección (MINECRAFT_LOG_LEVEL=debug)")
+
+        return Classification(real, bots, boards, parsed.skins, item_boards, ranks)
@@ -0,0 +1,61 @@
+"""
+Línea de comandos: python -m mcstats (o generate_stats_with_password.py)
+
+Códigos de salida: 0 página generada, 1 error, EXIT_UNCHANGED si nada de
+lo publicado cambió desde la ejecución anterior (el workflow omite
+entonces el deploy). Con --watch el proceso sigue en marcha hasta Ctrl+C.
+"""
+
+import argparse
+import logging
+
+from mcstats.checkpoints import STAGES
+from mcstats.config import Config
+from mcstats.errors import StatsError
+from mcstats.log import setup_logging
+from mcstats.pipeline import run
+from mcstats.watch import watch
+
+EXIT_UNCHANGED = 3
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="mcstats",
+                                     description="Genera la página de estadísticas del servidor de Minecraft")
+    parser.add_argument("--checkpoint-dir",
+                        help="guarda la salida de cada etapa en esta carpeta (MINECRAFT_CHECKPOINT_DIR)")
+    parser.add_argument("--from-stage", choices=STAGES, default="fetch",
+                        help="empieza en esta etapa con los checkpoints de la anterior")
+    parser.add_argument("--watch", type=float, metavar="SEGUNDOS", dest="watch_interval",
+                        help="sigue en marcha y regenera cuando cambia el mundo (MINECRAFT_WATCH_INTERVAL)")
+    verbosity = parser.add_mutually_exclusive_group()
+    verbosity.add_argument("-v", "--verbose", action="store_const", const="debug", dest="log_level",
+                           help="muestra también el detalle de cada jugador (MINECRAFT_LOG_LEVEL=debug)")
+    verbosity.add_argument("-q", "--quiet", action="store_const", const="warning", dest="log_level",
+                           help="solo avisos y errores")
+    args = parser.parse_args(argv)
+
+    config = Config.from_env()
+    if args.checkpoint_dir:
+        config.checkpoint_dir = args.checkpoint_dir
+    if args.log_level:
+        config.log_level = args.log_level
+    if args.watch_interval is not None:
+        config.watch_interval = args.watch_interval
+
+    log = logging.getLogger("mcstats")
+    try:
+        setup_logging(config.log_level)
+        config.check_choices()
+        if config.watch_interval > 0:
+            if args.from_stage != "fetch":
+                raise StatsError("--watch siempre empieza en fetch")
+            try:
+                watch(config)
+            except KeyboardInterrupt:
+                log.info("👋 Modo watch detenido")
+            return 0
+        written = run(config, args.from_stage)
+    except StatsError as e:
+        log.error(f"❌ ERROR: {e}")
+        return 1
+    return 0 if written else EXIT_UNCHANGED
@@ -0,0 +1,202 @@
+"""
+Configuración del generador. Todo se lee de variables de entorno
+MINECRAFT_* para que el workflow solo tenga que exportar secretos.
+"""
+
+import os
+from dataclasses import dataclass, field
+
+from mcstats.errors import StatsError
+
+# Valores admitidos de las opciones con nombre (variable → valores)
+CHOICES = {
+    "source": ("MINECRAFT_SOURCE", ("sftp", "local", "archive")),
+    "transfer_mode": ("MINECRAFT_TRANSFER_MODE", ("sftp", "tar", "agent")),
+    "stats_encoding": ("MINECRAFT_STATS_ENCODING", ("plain", "columnar")),
+    "archive_compression": ("MINECRAFT_ARCHIVE_COMPRESSION", ("gzip", "zstd")),
+}
+
+def env_flag(environ, name, default=False):
+    value = environ.get(name, "")
+    if not value:
+        return default
+    return value.lower() in ("1", "true", "yes")
+
+
+@dataclass
+class Config:
+    # Origen de los datos: "sftp" (servidor remoto), "local" (el script corre
+    # en el propio servidor) o "archive" (copia de seguridad en un .tar)
+    source: str = "sftp"
+    # Carpeta del servidor que corresponde a la raíz del SFTP: la usan el
+    # modo local y los comandos remotos de los modos tar y agent
+    server_root: str = "/"
+    archive_path: str = ""
+
+    ssh_host: str = None
+    ssh_port: int = 22
+    ssh_user: str = None
+    ssh_password: str = None
+    # Segundos entre keepalives SSH (0 = sin keepalive)
+    ssh_keepalive: int = 30
+    world_path: str = "/world"
+    usercache_path: str = "/usercache.json"
+
+    template_path: str = "template.html"
+    output_html: str = "index.html"
+    top_limit: int = 100
+
+    # La página lleva solo el resumen de cada jugador; el detalle (extras y
+    # logros) va en players/<uuid>.json y se carga al abrir el perfil.
+    # Con False todo va dentro de index.html (útil para abrirlo sin servidor).
+    split_details: bool = True
+    details_dir: str = "players"
+
+    # Copias .gz y .br de cada archivo generado (para servirlas sin
+    # comprimir al vuelo) y manifiesto con el sha256 de cada uno
+    precompress: bool = True
+    # Calidad de brotli (0-11): a partir de 10 comprime poco más y tarda
+    # decenas de veces más. Las copias se comprimen en compress_workers hilos.
+    brotli_quality: int = 5
+    compress_workers: int = 4
+    artifacts_manifest: str = "artifacts.json"
+
+    # Si nada de lo que se publica cambió desde la ejecución anterior no se
+    # escribe nada (el workflow omite entonces el deploy); force regenera
+    force: bool = False
+
+    # Codificación de los extras: "plain" (objeto clave → valor) o
+    # "columnar" (tabla de claves única y pares índice/valor por jugador)
+    stats_encoding: str = "plain"
+
+    # Modo streaming: cada jugador se clasifica en cuanto llega y solo se
+    # conservan los top_limit mejores y los bots (memoria acotada en mundos
+    # enormes). El resultado es idéntico al modo normal. La memoria solo
+    # queda acotada sin item_leaderboards ni stat_ranks, que con
+    # MINECRAFT_STREAMING están desactivados salvo que se pidan.
+    streaming: bool = False
+
+    # Clasificaciones extra (top por bloques, kills, distancia...) y claves
+    # de minecraft:custom adicionales
+    leaderboard_limit: int = 10
+    leaderboard_stats: list = field(default_factory=list)
+    # Clasificaciones por objeto (minecraft:mined, minecraft:killed...) de
+    # todos los jugadores reales, con leaderboard_limit puestos por objeto.
+    # Se guardan las cantidades de todos: en modo streaming la memoria crece
+    # con el número de jugadores. Vacío = no se generan.
+    item_leaderboards: str = "items.json"
+    # Puesto y percentil de cada jugador publicado en cada estadística
+    # (principales, extras y por objeto) entre todos los jugadores reales;
+    # van en el detalle de cada perfil
+    stat_ranks: bool = True
+
+    # Descargas simultáneas (un canal SFTP por hilo). OpenSSH admite 10
+    # canales por conexión por defecto (MaxSessions): no conviene pasar de 9.
+    fetch_workers: int = 8
+    # Procesos que decodifican y resumen el JSON de los jugadores mientras
+    # se descarga (0 = en los hilos de descarga). Compensa en mundos grandes
+    # con varios núcleos: cada proceso tarda en arrancar.
+    parse_workers: int = 0
+
+    # Caché persistente entre ejecuciones (vacío = desactivada)
+    cache_dir: str = ""
+
+    # Modo de transferencia con el source sftp: "sftp" (archivo por
+    # archivo), "tar" (un único flujo comprimido generado en el servidor) o
+    # "agent" (el servidor resume las estadísticas con mcstats/agent.py).
+    # Los dos últimos requieren acceso a shell.
+    transfer_mode: str = "sftp"
+    archive_compression: str = "gzip"
+    # Dónde se sube el agente (ruta SFTP) y con qué intérprete se ejecuta
+    agent_path: str = "/.mcstats_agent.py"
+    agent_python: str = "python3"
+
+    # Carpeta donde cada etapa deja su resultado (vacío = sin checkpoints)
+    checkpoint_dir: str = ""
+
+    # Métricas de la ejecución (ver metrics.py): JSON y textfile de
+    # Prometheus. Vacío = no se escriben.
+    metrics_path: str = ""
+    prometheus_textfile: str = ""
+
+    # Nivel de la consola: "info" solo muestra el resumen de cada etapa,
+    # "debug" también cada jugador. classification_log guarda la decisión
+    # de classify sobre cada jugador en NDJSON (vacío = no se guarda).
+    log_level: str = "info"
+    classification_log: str = ""
+
+    # Modo watch (ver watch.py): segundos entre comprobaciones del mundo con
+    # la sesión SSH abierta. 0 = una sola ejecución.
+    watch_interval: float = 0
+
+    @classmethod
+    def from_env(cls, environ=None):
+        env = os.environ if environ is None else environ
+        streaming = env_flag(env, 'MINECRAFT_STREAMING')
+        return cls(
+            source=env.get('MINECRAFT_SOURCE', 'sftp').lower(),
+            server_root=env.get('MINECRAFT_SERVER_ROOT', '/'),
+            archive_path=env.get('MINECRAFT_ARCHIVE_PATH', ''),
+            ssh_host=env.get('MINECRAFT_SSH_HOST'),
+            ssh_port=int(env.get('MINECRAFT_SSH_PORT') or '22'),
+            ssh_user=env.get('MINECRAFT_SSH_USER'),
+            ssh_password=env.get('MINECRAFT_SSH_PASSWORD'),
+            ssh_keepalive=int(env.get('MINECRAFT_SSH_KEEPALIVE', '30')),
+            world_path=env.get('MINECRAFT_WORLD_PATH', '/world'),
+            split_details=env_flag(env, 'MINECRAFT_SPLIT_DETAILS', True),
+            precompress=env_flag(env, 'MINECRAFT_PRECOMPRESS', True),
+            brotli_quality=min(11, max(0, int(env.get('MINECRAFT_BROTLI_QUALITY', '5')))),
+            compress_workers=max(1, int(env.get('MINECRAFT_COMPRESS_WORKERS', '4'))),
+            force=env_flag(env, 'MINECRAFT_FORCE'),
+            stats_encoding=env.get('MINECRAFT_STATS_ENCODING', 'plain').lower(),
+            streaming=streaming,
+            leaderboard_limit=max(0, int(env.get('MINECRAFT_LEADERBOARD_LIMIT', '10'))),
+            leaderboard_stats=[k.strip() for k in env.get('MINECRAFT_LEADERBOARD_STATS', '').split(",") if k.strip()],
+            item_leaderboards=env.get('MINECRAFT_ITEM_LEADERBOARDS', '' if streaming else 'items.json'),
+            stat_ranks=env_flag(env, 'MINECRAFT_STAT_RANKS', not streaming),
+            fetch_workers=max(1, int(env.get('MINECRAFT_FETCH_WORKERS', '8'))),
+            parse_workers=max(0, int(env.get('MINECRAFT_PARSE_WORKERS', '0'))),
+            cache_dir=os.path.expanduser(env.get('MINECRAFT_CACHE_DIR', '')),
+            transfer_mode=env.get('MINECRAFT_TRANSFER_MODE', 'sftp').lower(),
+            archive_compression=env.get('MINECRAFT_ARCHIVE_COMPRESSION', 'gzip').lower(),
+            agent_path=env.get('MINECRAFT_AGENT_PATH', '/.mcstats_agent.py'),
+            agent_python=env.get('MINECRAFT_AGENT_PYTHON', 'python3'),
+            checkpoint_dir=os.path.expanduser(env.get('MINECRAFT_CHECKPOINT_DIR', '')),
+            metrics_path=os.path.expanduser(env.get('MINECRAFT_METRICS_PATH', '')),
+            prometheus_textfile=os.path.expanduser(env.get('MINECRAFT_PROMETHEUS_TEXTFILE', '')),
+            log_level=env.get('MINECRAFT_LOG_LEVEL', 'info').lower(),
+            classification_log=os.path.expanduser(env.get('MINECRAFT_CLASSIFICATION_LOG', '')),
+            watch_interval=float(env.get('MINECRAFT_WATCH_INTERVAL') or '0'),
+        )
+
+    def check_choices(self):
+        """Un valor mal escrito (agnet...) es un error, no el modo por defecto"""
+        for attr, (name, allowed) in CHOICES.items():
+            value = getattr(self, attr)
+            if value not in allowed:
+                raise StatsError(f"{name} desconocido: {value} (usa {', '.join(allowed)})")
+
+    def validate(self):
+        """Comprueba lo necesario para leer el mundo (la etapa fetch)"""
+        self.check_choices()
+        if self.source not in ("local", "archive") and not all([self.ssh_host, self.ssh_user, self.ssh_password]):
+            raise StatsError("Faltan variables de entorno")
+        if self.source == "archive" and not self.archive_path:
+            raise StatsError("Falta MINECRAFT_ARCHIVE_PATH")
+
+    @property
+    def item_stats(self):
+        """Si hacen falta las cantidades por objeto de todos los jugadores"""
+        return bool(self.item_leaderboards or self.stat_ranks)
+
+    @property
+    def stats_folder(self):
+        return self.world_path.rstrip("/") + "/stats"
+
+    @property
+    def advancements_folder(self):
+        return self.world_path.rstrip("/") + "/advancements"
+
+    @property
+    def skinrestorer_folder(self):
+        return self.world_path.rstrip("/") + "/skinrestorer"
@@ -0,0 +1,8 @@
+"""
+Errores que detienen la generación. La línea de comandos los muestra y
+termina con código 1; usado como biblioteca, el llamador decide.
+"""
+
+
+class StatsError(Exception):
+    pass
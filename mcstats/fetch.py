@@ -0,0 +1,377 @@
+"""
+Etapa fetch: abre el origen y reúne lo que hace falta de cada jugador
+(nombres, texturas de skin, estadísticas y logros)
+"""
+
+import itertools
+import logging
+import multiprocessing
+import posixpath
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from mcstats import jsonio
+from mcstats.agent import skin_texture_hash
+from mcstats.cache import file_sig
+from mcstats.errors import StatsError
+from mcstats.metrics import Metrics
+from mcstats.parse import advancements_raw, summarize_raw
+from mcstats.record import PlayerRecord
+from mcstats.remote import connect_ssh, fetch_remote_archive, run_agent
+from mcstats.sources import ArchiveSource, LocalSource, SFTPSource
+
+log = logging.getLogger(__name__)
+
+class FetchResult:
+    """
+    Salida de fetch. items produce (posición en el listado, archivo,
+    entrada) una sola vez y a medida que llegan las descargas. La entrada
+    es {"record": ...} si el jugador ya viene procesado (caché o agente),
+    {"sig", "stats", "advancements"} con los JSON descargados o, con el
+    pool de procesos, {"sig", "summary", "completed"} ya resumidos.
+    """
+    def __init__(self, names, skins, items, source=None, cache=None, started=None):
+        self.names = names
+        self.skins = skins
+        self.items = items
+        self.source = source
+        self.cache = cache
+        self.started = time.monotonic() if started is None else started
+
+    def report(self, processed):
+        log.info(f"✅ {processed} jugadores procesados")
+        if self.source is not None:
+            elapsed = time.monotonic() - self.started
+            bytes_read = self.source.bytes_read
+            rate = bytes_read / elapsed / 1024 if elapsed > 0 else 0
+            log.info(f"📶 {bytes_read / 1048576:.1f} MB leídos en {elapsed:.1f}s ({rate:.0f} KB/s)")
+        if self.cache is not None and self.cache.enabled:
+            counts = self.cache.counts
+            log.info(f"📦 Caché: {counts['file_hits']} archivos reutilizados, {counts['file_misses']} descargados")
+            log.info(f"📦 Caché: {counts['player_hits']} jugadores sin cambios, {counts['player_misses']} procesados")
+
+def open_source(config, metrics=None):
+    """Abre el origen configurado. Devuelve (source, ssh); ssh es None sin conexión SSH"""
+    metrics = metrics or Metrics()
+    with metrics.stage("connect") as stage:
+        if config.source == "local":
+            log.info(f"💽 Leyendo el servidor desde el disco local ({config.server_root})")
+            return LocalSource(config.server_root), None
+
+        if config.source == "archive":
+            log.debug(f"🗜️  Leyendo la copia {config.archive_path}...")
+            try:
+                with open(config.archive_path, 'rb') as f:
+                    source = ArchiveSource(f)
+            except Exception as e:
+                raise StatsError(f"al leer {config.archive_path}: {e}")
+            log.info(f"✅ {len(source.files)} archivos en la copia")
+            stage.add("bytes", source.bytes_read)
+            return source, None
+
+        ssh = connect_ssh(config)
+        source = SFTPSource(ssh)
+
+        if config.transfer_mode == "tar":
+            log.debug("🗜️  Descargando el mundo como un único archivo comprimido...")
+            try:
+                archive = fetch_remote_archive(ssh, config)
+                total = sum(len(data) for _, data in archive.files.values())
+                log.info(f"✅ {len(archive.files)} archivos recibidos ({total} bytes sin comprimir)")
+                stage.add("bytes", archive.bytes_read)
+                source.close()
+                source = archive
+            except Exception as e:
+                stage.add("errors")
+                log.warning(f"⚠️  Modo tar no disponible ({e}), usando SFTP")
+
+        return source, ssh
+
+def read_json(source, cache, path, sig, stage, keep=False, decode=jsonio.loads):
+    """
+    Lee un JSON del source. Si se pasa la firma (tamaño, mtime) del listado
+    y coincide con la guardada en la caché, se lee la copia local. Archivos,
+    bytes, aciertos de caché y errores se anotan en stage. keep marca los
+    archivos que la caché en memoria guarda tal cual (nombres y skins; de
+    los jugadores ya guarda el registro). decode recibe los bytes y puede
+    devolver algo más que el JSON (lo que devuelve el pool de procesos).
+    """
+    cacheable = source.cacheable
+    data = cache.read(path, sig) if cacheable else None
+    from_cache = data is not None
+    if from_cache:
+        stage.add("cache_hits")
+    else:
+        try:
+            data = source.read(path, sig[0] if sig else None)
+        except:
+            stage.add("errors")
+            return None
+        stage.add("files")
+        stage.add("bytes", len(data))
+
+    try:
+        parsed = decode(data)
+    except:
+        if from_cache or sig is None:
+            stage.add("errors")
+            return None
+        # El archivo cambió entre el listado y la lectura: leerlo completo
+        try:
+            data = source.read(path)
+            stage.add("bytes", len(data))
+            parsed = decode(data)
+        except:
+            stage.add("errors")
+            return None
+
+    if cacheable and not from_cache:
+        cache.store(path, sig, data, keep)
+    return parsed
+
+def fetch_agent(config, source, ssh, started, stage):
+    """Modo agent: el servidor devuelve los jugadores ya resumidos (None si falla)"""
+    log.debug("🛰️  Resumiendo estadísticas en el servidor...")
+    try:
+        agent_records, received = run_agent(ssh, source.sftp, config)
+    except Exception as e:
+        stage.add("errors")
+        log.warning(f"⚠️  Agente remoto no disponible ({e}), usando SFTP")
+        return None
+    stage.add("bytes", received)
+    stage.add("players", len(agent_records))
+
+    names = {}
+    skins = {}
+    entries = []
+    for record in agent_records:
+        uuid_clean = record["uuid"].replace("-", "")
+        names[uuid_clean] = record["name"]
+        if record.get("skin"):
+            skins[uuid_clean] = record["skin"]
+        # El agente solo envía las claves de los logros completados, que es
+        # lo que guarda PlayerRecord
+        entries.append((record["uuid"] + ".json", {"record": PlayerRecord.from_dict(record)}))
+    log.info(f"✅ {len(entries)} jugadores resumidos ({received} bytes recibidos)")
+    log.info(f"✅ {len(skins)} texturas cargadas")
+
+    items = ((index, fname, entry) for index, (fname, entry) in enumerate(entries))
+    return FetchResult(names, skins, items, source, started=started)
+
+def fetch(config, source, cache, ssh=None, metrics=None, listing=None):
+    """
+    Etapa fetch. Nombres y texturas se cargan aquí mismo; las estadísticas
+    se descargan al recorrer items, en paralelo con las etapas siguientes.
+    En metrics queda cada parte por separado: agent, list, names, skins y
+    stats. Con listing (modo watch) no se lista el mundo.
+    """
+    metrics = metrics or Metrics()
+    started = time.monotonic()
+    if config.transfer_mode == "agent" and isinstance(source, SFTPSource):
+        with metrics.stage("agent") as stage:
+            result = fetch_agent(config, source, ssh, started, stage)
+        if result is not None:
+            return result
+
+    pool = ThreadPoolExecutor(max_workers=config.fetch_workers)
+    # spawn: el proceso principal ya tiene hilos (paramiko) y fork no es seguro
+    procs = (ProcessPoolExecutor(max_workers=config.parse_workers, mp_context=multiprocessing.get_context("spawn"))
+             if config.parse_workers > 0 else None)
+
+    def shutdown():
+        pool.shutdown()
+        if procs is not None:
+            procs.shutdown()
+
+    try:
+        with metrics.stage("list") as stage:
+            if listing is None:
+                listing = list_world(config, source)
+            fnames, stats_sigs, adv_sigs, advancements_available = list_players(config, listing, stage)
+        with metrics.stage("names") as stage:
+            names = load_names(config, source, cache, stage, listing.usercache)
+        with metrics.stage("skins") as stage:
+            skins = load_skins(config, source, cache, pool, stage,
+                               listing.folders.get(config.skinrestorer_folder))
+    except:
+        shutdown()
+        raise
+    stats_stage = metrics.get("stats")
+
+    def load_summary(fname, sig):
+        """Con el pool de procesos: el hilo descarga y espera al resumen"""
+        summary = read_json(source, cache, f"{config.stats_folder}/{fname}", sig[0], stats_stage,
+                            decode=lambda data: procs.submit(summarize_raw, data, config.item_stats).result())
+        if summary is None:
+            return None
+
+        completed = None
+        if advancements_available:
+            completed = read_json(source, cache, f"{config.advancements_folder}/{fname}", sig[1], stats_stage,
+                                  decode=lambda data: procs.submit(advancements_raw, data).result())
+        return {"sig": sig, "summary": summary, "completed": completed or {}}
+
+    def load_entry(fname):
+        sig = [stats_sigs[fname], adv_sigs.get(fname)]
+        record = cache.player(fname, sig)
+        if record is not None:
+            stats_stage.add("player_cache_hits")
+            return {"record": record}
+        if procs is not None:
+            return load_summary(fname, sig)
+
+        stats_data = read_json(source, cache, f"{config.stats_folder}/{fname}", sig[0], stats_stage)
+        if stats_data is None:
+            return None
+
+        adv_data = None
+        if advancements_available:
+            adv_data = read_json(source, cache, f"{config.advancements_folder}/{fname}", sig[1], stats_stage)
+        return {"sig": sig, "stats": stats_data, "advancements": adv_data}
+
+    def items():
+        log.debug(f"⚡ Descargando con {config.fetch_workers} canales en paralelo...")
+        try:
+            if config.streaming:
+                results = stream_entries(pool, load_entry, fnames, config.fetch_workers * 4)
+            else:
+                results = enumerate(pool.map(load_entry, fnames))
+            for index, entry in results:
+                if entry is not None:
+                    yield index, fnames[index], entry
+        finally:
+            shutdown()
+
+    return FetchResult(names, skins, metrics.timed("stats", items()), source, cache, started)
+
+def load_names(config, source, cache, stage, uc_sig):
+    names = {}
+
+    log.debug("📝 Cargando nombres de jugadores...")
+
+    uc = read_json(source, cache, config.usercache_path, uc_sig, stage, keep=True)
+    if uc:
+        for e in uc:
+            names[e["uuid"].replace("-", "")] = e["name"]
+        log.info(f"✅ {len(names)} nombres cargados")
+    return names
+
+def load_skins(config, source, cache, pool, stage, skin_sigs):
+    log.debug("🎨 Cargando texturas de skins...")
+    skins = {}
+
+    def load_skin(fname):
+        return read_json(source, cache, f"{config.skinrestorer_folder}/{fname}", skin_sigs[fname], stage, keep=True)
+
+    if skin_sigs is None:
+        stage.add("errors")
+        log.warning("⚠️  SkinRestorer no disponible")
+        return skins
+
+    try:
+        fnames = [f for f in skin_sigs if f.endswith(".json")]
+
+        for fname, skin_data in zip(fnames, pool.map(load_skin, fnames)):
+            texture_hash = skin_texture_hash(skin_data)
+            if texture_hash:
+                skins[fname[:-5].replace("-", "")] = texture_hash
+
+        log.info(f"✅ {len(skins)} texturas cargadas")
+    except:
+        stage.add("errors")
+        log.warning("⚠️  SkinRestorer no disponible")
+    return skins
+
+class Listing:
+    """
+    Firmas (tamaño, mtime) de lo que fetch lee del mundo: folders tiene
+    {archivo: firma} de stats/, advancements/ y skinrestorer/ (sin la
+    carpeta si no existe) y usercache la de usercache.json. El modo watch la
+    mantiene al día con los cambios y se la pasa a fetch para no volver a
+    listar el mundo en cada pasada.
+    """
+    def __init__(self, config, folders, usercache):
+        self.config = config
+        self.folders = folders
+        self.usercache = usercache
+
+    def files(self):
+        """{ruta: firma} de todo lo listado"""
+        files = {f"{folder}/{fname}": sig
+                 for folder, sigs in self.folders.items() for fname, sig in sigs.items()}
+        if self.usercache is not None:
+            files[self.config.usercache_path] = self.usercache
+        return files
+
+    def update(self, source, path):
+        """Vuelve a leer la firma de un archivo que cambió (o lo quita si ya no está)"""
+        try:
+            sig = file_sig(source.stat(path))
+        except FileNotFoundError:
+            sig = None
+        if path == self.config.usercache_path:
+            self.usercache = sig
+            return
+        folder, fname = posixpath.split(path)
+        sigs = self.folders.setdefault(folder, {})
+        if sig is None:
+            sigs.pop(fname, None)
+        else:
+            sigs[fname] = sig
+
+def list_world(config, source):
+    """Lista stats/ (obligatoria), advancements/ y skinrestorer/ y la firma de usercache.json"""
+    folders = {}
+    for folder in (config.stats_folder, config.advancements_folder, config.skinrestorer_folder):
+        try:
+            folders[folder] = {attr.filename: file_sig(attr) for attr in source.listdir_attr(folder)}
+        except Exception as e:
+            if folder == config.stats_folder:
+                raise StatsError(f"al acceder a {config.stats_folder}: {e}")
+
+    try:
+        usercache = file_sig(source.stat(config.usercache_path))
+    except:
+        usercache = None
+    return Listing(config, folders, usercache)
+
+def list_players(config, listing, stage):
+    """Archivos de stats/ y advancements/ con la firma de cada uno"""
+    log.debug(f"📊 Leyendo estadísticas desde {config.stats_folder}...")
+
+    # Verificar advancements
+    adv_sigs = listing.folders.get(config.advancements_folder)
+    advancements_available = adv_sigs is not None
+    if advancements_available:
+        log.debug("✅ Carpeta de logros encontrada")
+    else:
+        adv_sigs = {}
+        stage.add("errors")
+        log.warning("⚠️  Carpeta de logros no encontrada")
+
+    stats_sigs = {fname: sig for fname, sig in listing.folders[config.stats_folder].items()
+                  if fname.endswith('.json')}
+
+    fnames = list(stats_sigs)
+    stage.add("entries", len(fnames) + len(adv_sigs))
+    log.info(f"📁 {len(fnames)} archivos de estadísticas encontrados")
+    if not fnames:
+        raise StatsError("No hay archivos de estadísticas")
+    return fnames, stats_sigs, adv_sigs, advancements_available
+
+def stream_entries(pool, load, fnames, window):
+    """
+    Carga con un número acotado de tareas en vuelo y entrega según terminan,
+    junto con la posición en el listado
+    """
+    pending = {}
+    queue = enumerate(fnames)
+    while True:
+        for index, fname in itertools.islice(queue, window - len(pending)):
+            pending[pool.submit(load, fname)] = index
+        if not pending:
+            return
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            index = pending.pop(future)
+            yield index, future.result()
@@ -0,0 +1,235 @@
+"""
+Clasificaciones por objeto de todo el servidor ("top 10 mineros de
+diamond_ore", "más zombis eliminados"...), una por objeto de cada categoría
+de ITEM_CATEGORIES, y el puesto de cada jugador publicado en cada
+estadística.
+
+classify deja las cantidades de cada jugador real en una ItemMatrix: por
+categoría, tres arrays en paralelo (fila del jugador, id del objeto,
+cantidad); con ranked también los contadores principales ("core") y los
+extras ("custom", por id del registro de statkeys). Al terminar se ordenan
+por objeto al estilo CSR, así el top de cada objeto es un tramo contiguo y
+el puesto de una cantidad, una búsqueda binaria en su tramo. Con NumPy la
+ordenación es vectorizada; sin él, un montículo acotado por objeto como
+TopK y listas ordenadas con bisect.
+"""
+
+import bisect
+import heapq
+import itertools
+from array import array
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from mcstats.agent import ITEM_CATEGORIES
+from mcstats.statkeys import item_registry, registry
+
+# Contadores principales con puesto: clave en ranks → atributo de PlayerRecord
+CORE_RANKS = (("time", "ticks"), ("blocks", "total_blocks"), ("kills", "total_killed"), ("deaths", "deaths"))
+CORE_IDS = array('I', range(len(CORE_RANKS)))
+MAX_PACKED = (1 << 32) - 1
+
+class ItemMatrix:
+    def __init__(self, ranked=False):
+        self.ranked = ranked
+        # (uuid, nombre) y posición en el listado de cada fila
+        self.players = []
+        self.orders = array('q')
+        categories = (("core", "custom") if ranked else ()) + ITEM_CATEGORIES
+        self.entries = {category: (array('I'), array('I'), array('q')) for category in categories}
+        # Por categoría: entradas ordenadas (packed) o, sin NumPy, las
+        # cantidades de cada objeto en orden ascendente
+        self.sorted = {}
+        self.columns = {}
+
+    def add(self, player, order):
+        row = len(self.players)
+        self.players.append((player.uuid, player.name))
+        self.orders.append(order)
+        if self.ranked:
+            self.append("core", row, CORE_IDS, array('q', (getattr(player, field) for _, field in CORE_RANKS)))
+            self.append("custom", row, player.layout.ids, player.values)
+        for category, ids, counts in player.items:
+            self.append(category, row, ids, counts)
+
+    def append(self, category, row, ids, counts):
+        # Las cantidades que no caben en 64 bits no se clasifican
+        if category not in self.entries or not isinstance(counts, array):
+            return
+        rows, item_ids, values = self.entries[category]
+        rows.extend(itertools.repeat(row, len(ids)))
+        item_ids.extend(ids)
+        values.extend(counts)
+
+    def positive(self, category):
+        rows, ids, counts = (numpy.frombuffer(a, dtype=dtype) for a, dtype in
+                             zip(self.entries[category], (numpy.uint32, numpy.uint32, numpy.int64)))
+        positive = counts > 0
+        return rows[positive], ids[positive], counts[positive]
+
+    def packed(self, category):
+        """
+        (filas, ids, cantidades, claves) de las cantidades > 0 ordenadas por
+        objeto y de mayor a menor cantidad, sin desempatar. La clave empaqueta
+        (id, cantidad) en 64 bits; None si alguna cantidad no cabe en 32.
+        """
+        if category not in self.sorted:
+            rows, ids, counts = self.positive(category)
+            packed = None
+            if not len(counts) or counts.max() <= MAX_PACKED:
+                keys = (ids.astype(numpy.int64) << 32) | (MAX_PACKED - counts)
+                by_item = numpy.argsort(keys)
+                packed = rows[by_item], ids[by_item], counts[by_item], keys[by_item]
+            self.sorted[category] = packed
+        return self.sorted[category]
+
+    def top(self, category, k):
+        """Id del objeto → [(fila, cantidad), ...] de mayor a menor, empates por llegada"""
+        if k <= 0:
+            return {}
+        if numpy is not None:
+            return self.top_numpy(category, k)
+        heaps = {}
+        for row, item_id, count in zip(*self.entries[category]):
+            if count <= 0:
+                continue
+            heap = heaps.setdefault(item_id, [])
+            entry = (count, -self.orders[row], row)
+            if len(heap) < k:
+                heapq.heappush(heap, entry)
+            elif entry > heap[0]:
+                heapq.heapreplace(heap, entry)
+        return {item_id: [(row, count) for count, _, row in sorted(heap, reverse=True)]
+                for item_id, heap in heaps.items()}
+
+    def top_numpy(self, category, k):
+        packed = self.packed(category)
+        if packed is None:
+            rows, ids, counts = self.positive(category)
+        else:
+            rows, ids, counts, _ = packed
+            if not len(ids):
+                return {}
+            # Solo los que llegan a la cantidad del k-ésimo de su objeto
+            # pueden entrar en el top
+            starts, lengths, _ = self.item_ranges(ids)
+            kth = counts[starts + numpy.minimum(lengths, k) - 1]
+            candidates = counts >= numpy.repeat(kth, lengths)
+            rows, ids, counts = rows[candidates], ids[candidates], counts[candidates]
+
+        # Por objeto, de mayor a menor cantidad y a igualdad por llegada
+        orders = numpy.frombuffer(self.orders, dtype=numpy.int64)[rows]
+        by_item = numpy.lexsort((orders, -counts, ids))
+        rows, ids, counts = rows[by_item], ids[by_item], counts[by_item]
+        keep = numpy.flatnonzero(self.item_ranges(ids)[2] < k)
+
+        boards = {}
+        for item_id, row, count in zip(ids[keep].tolist(), rows[keep].tolist(), counts[keep].tolist()):
+            boards.setdefault(item_id, []).append((row, count))
+        return boards
+
+    @staticmethod
+    def item_ranges(ids):
+        """Con ids ordenados: inicio (indptr) y largo del tramo de cada objeto y posición en él"""
+        starts = numpy.flatnonzero(numpy.r_[True, ids[1:] != ids[:-1]])
+        lengths = numpy.diff(numpy.r_[starts, len(ids)])
+        position = numpy.arange(len(ids)) - numpy.repeat(starts, lengths)
+        return starts, lengths, position
+
+    def leaderboards(self, k):
+        """
+        Lo que se publica: {"players": [[uuid, nombre], ...], "categories":
+        {categoría: {objeto: [[jugador, cantidad], ...]}}}, con los jugadores
+        por su posición en players y los objetos ordenados por nombre
+        """
+        players, index = [], {}
+        categories = {}
+        for category in ITEM_CATEGORIES:
+            boards = self.top(category, k)
+            if not boards:
+                continue
+            named = {}
+            for item_id in sorted(boards, key=item_registry.key):
+                entries = []
+                for row, count in boards[item_id]:
+                    if row not in index:
+                        index[row] = len(players)
+                        players.append(list(self.players[row]))
+                    entries.append([index[row], count])
+                named[item_registry.key(item_id)] = entries
+            categories[category] = named
+        return {"players": players, "categories": categories}
+
+    def ranks(self, category, queries):
+        """
+        Puesto de cada (id, cantidad) de queries entre los jugadores de la
+        matriz: 1 + cuántos tienen más (los empatados comparten puesto)
+        """
+        if not queries:
+            return []
+        packed = self.packed(category) if numpy is not None else None
+        if packed is not None:
+            keys = packed[3]
+            ids = numpy.array([item_id for item_id, _ in queries], dtype=numpy.int64) << 32
+            # Una cantidad mayor que cualquiera de la matriz va la primera
+            counts = numpy.minimum([count for _, count in queries], MAX_PACKED).astype(numpy.int64)
+            above = numpy.searchsorted(keys, ids | (MAX_PACKED - counts)) - numpy.searchsorted(keys, ids)
+            return (above + 1).tolist()
+
+        if category not in self.columns:
+            columns = {}
+            for item_id, count in zip(*self.entries[category][1:]):
+                if count > 0:
+                    columns.setdefault(item_id, []).append(count)
+            for counts in columns.values():
+                counts.sort()
+            self.columns[category] = columns
+        columns = self.columns[category]
+        ranks = []
+        for item_id, count in queries:
+            counts = columns.get(item_id, ())
+            ranks.append(len(counts) - bisect.bisect_right(counts, count) + 1)
+        return ranks
+
+    def player_ranks(self, players):
+        """
+        Puesto y percentil (el "top N %", de 1 a 100) de cada jugador de
+        players en cada estadística que tiene por encima de 0:
+        {uuid: {"population": jugadores, "time": [puesto, top], ...,
+        "extras": {clave: [puesto, top]}, "items": {categoría: [puesto, ...]}}}.
+        Los puestos por objeto van en el orden de los objetos del jugador en
+        esa categoría (0 = sin puesto) y sin el top, que sale de population:
+        son la mayor parte del perfil y así no se repite cada clave. Las
+        consultas de cada categoría se resuelven todas juntas.
+        """
+        population = len(self.players)
+        players = list({p.uuid: p for p in players}.values())
+        result = {p.uuid: {"population": population} for p in players}
+        queries = {category: [] for category in self.entries}
+        for p in players:
+            for stat_id, (_, field) in enumerate(CORE_RANKS):
+                queries["core"].append((p.uuid, stat_id, getattr(p, field), None))
+            queries["custom"].extend((p.uuid, stat_id, value, None) for stat_id, value in p.stat_id_items())
+            for category, ids, counts in p.items:
+                if category in queries:
+                    queries[category].extend((p.uuid, item_id, count, position)
+                                             for position, (item_id, count) in enumerate(zip(ids, counts)))
+                    result[p.uuid].setdefault("items", {})[category] = [0] * len(ids)
+
+        for category, entries in queries.items():
+            entries = [e for e in entries if isinstance(e[2], int) and e[2] > 0]
+            ranks = self.ranks(category, [(stat_id, value) for _, stat_id, value, _ in entries])
+            for (uuid, stat_id, _, position), rank in zip(entries, ranks):
+                if category not in ("core", "custom"):
+                    result[uuid]["items"][category][position] = rank
+                    continue
+                # Un bot (fuera de la población) puede quedar detrás del último
+                top = -(-100 * rank // max(population, rank))
+                if category == "core":
+                    result[uuid][CORE_RANKS[stat_id][0]] = [rank, top]
+                else:
+                    result[uuid].setdefault("extras", {})[registry.key(stat_id)] = [rank, top]
+        return result
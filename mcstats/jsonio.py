@@ -0,0 +1,49 @@
+"""
+JSON rápido si está instalado: orjson para leer y escribir (o ujson solo
+para leer) y la biblioteca estándar si no hay ninguno.
+
+dumps escribe siempre el formato compacto de orjson (sin espacios y UTF-8
+sin escapar, como ensure_ascii=False): con json se piden los mismos
+separadores, así los archivos publicados son idénticos byte a byte con
+cualquier backend. Lo que orjson no admite (enteros de más de 64 bits,
+surrogates sueltos...) se escribe con json. Los números decimales podrían
+diferir en la notación exponencial, pero Minecraft solo guarda enteros.
+
+Los objetos con as_dict() (PlayerRecord) se escriben como ese dict.
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+BACKEND = "orjson" if orjson is not None else "ujson" if ujson is not None else "json"
+
+def loads(data):
+    """Acepta str o bytes; los errores son ValueError con cualquier backend"""
+    if orjson is not None:
+        return orjson.loads(data)
+    if ujson is not None:
+        return ujson.loads(data)
+    return json.loads(data)
+
+def encode_default(obj):
+    as_dict = getattr(obj, "as_dict", None)
+    if as_dict is None:
+        raise TypeError(f"{type(obj).__name__} no se puede escribir como JSON")
+    return as_dict()
+
+def dumps(obj):
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, default=encode_default).decode('utf-8')
+        except TypeError:
+            pass
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=encode_default)
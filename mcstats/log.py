@@ -0,0 +1,55 @@
+"""
+Salida por consola con logging. Por defecto (info) solo se ve el resumen de
+cada etapa; con debug también el detalle de cada jugador. La decisión de
+classify sobre cada jugador puede guardarse aparte en NDJSON
+(MINECRAFT_CLASSIFICATION_LOG) sin llenar la consola.
+"""
+
+import logging
+import os
+import sys
+
+from mcstats import jsonio
+from mcstats.errors import StatsError
+
+LEVELS = {"debug": logging.DEBUG, "info": logging.INFO, "warning": logging.WARNING, "error": logging.ERROR}
+
+def setup_logging(level="info"):
+    """Configura el logger mcstats; los módulos solo usan logging.getLogger(__name__)"""
+    if level not in LEVELS:
+        raise StatsError(f"Nivel de log desconocido: {level} (usa {', '.join(LEVELS)})")
+    logger = logging.getLogger("mcstats")
+    logger.setLevel(LEVELS[level])
+    if not logger.handlers:
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        logger.propagate = False
+    return logger
+
+class ClassificationLog:
+    """
+    Una línea JSON por jugador con la decisión de classify. Se escribe a un
+    temporal y se renombra al cerrar, como los checkpoints.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path + ".tmp", 'w', encoding='utf-8')
+
+    def write(self, order, player, score, bot):
+        self.file.write(jsonio.dumps({
+            "order": order,
+            "uuid": player.uuid,
+            "name": player.name,
+            "ticks": player.ticks,
+            "score": score,
+            "bot": bot,
+        }) + "\n")
+
+    def close(self):
+        self.file.close()
+        os.replace(self.path + ".tmp", self.path)
+
+    def discard(self):
+        self.file.close()
+        os.remove(self.path + ".tmp")
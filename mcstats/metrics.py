@@ -0,0 +1,138 @@
+"""
+Métricas de cada ejecución: tiempo real y de CPU, bytes, archivos, aciertos
+de caché y errores por etapa. Se escriben al final en JSON
+(MINECRAFT_METRICS_PATH) y, si se pide, en formato textfile de Prometheus
+(MINECRAFT_PROMETHEUS_TEXTFILE) para el collector de node_exporter.
+
+Los tiempos son exclusivos: fetch y parse se recorren dentro de classify,
+así que mientras una etapa espera a la anterior el reloj corre para esa.
+El tiempo de CPU es el del proceso entero (todos los hilos) durante la
+etapa.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+log = logging.getLogger(__name__)
+
+class StageMetrics:
+    def __init__(self):
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.counters = {}
+        self.lock = threading.Lock()
+
+    def add(self, key, n=1):
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + n
+
+    def as_dict(self):
+        return dict({"wall_seconds": round(self.wall, 6), "cpu_seconds": round(self.cpu, 6)}, **self.counters)
+
+class Metrics:
+    def __init__(self):
+        self.stages = {}
+        self.stack = []
+        self.started = time.time()
+        self.wall_started = time.perf_counter()
+        self.cpu_started = time.process_time()
+        self.mark = None
+        self.status = None
+
+    def get(self, name):
+        stage = self.stages.get(name)
+        if stage is None:
+            stage = self.stages[name] = StageMetrics()
+        return stage
+
+    def add(self, name, key, n=1):
+        self.get(name).add(key, n)
+
+    def charge(self):
+        """Apunta lo transcurrido desde la última marca a la etapa en curso"""
+        wall, cpu = time.perf_counter(), time.process_time()
+        if self.stack:
+            stage = self.get(self.stack[-1])
+            stage.wall += wall - self.mark[0]
+            stage.cpu += cpu - self.mark[1]
+        self.mark = (wall, cpu)
+
+    @contextmanager
+    def stage(self, name):
+        """Mide un bloque; si hay una etapa en curso queda en pausa mientras tanto"""
+        self.charge()
+        self.stack.append(name)
+        try:
+            yield self.get(name)
+        finally:
+            self.charge()
+            self.stack.pop()
+
+    def timed(self, name, iterator):
+        """Envuelve un iterador perezoso: cada next() cuenta para name"""
+        while True:
+            with self.stage(name):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+
+    def as_dict(self):
+        return {
+            "started": self.started,
+            "status": self.status,
+            "wall_seconds": round(time.perf_counter() - self.wall_started, 6),
+            "cpu_seconds": round(time.process_time() - self.cpu_started, 6),
+            "stages": {name: stage.as_dict() for name, stage in self.stages.items()},
+        }
+
+    def write_json(self, path):
+        write_atomic(path, json.dumps(self.as_dict(), indent=1) + "\n")
+
+    def write_prometheus(self, path):
+        data = self.as_dict()
+        lines = [
+            "# HELP mcstats_run_timestamp_seconds Inicio de la última ejecución",
+            "# TYPE mcstats_run_timestamp_seconds gauge",
+            f"mcstats_run_timestamp_seconds {data['started']:.0f}",
+            "# HELP mcstats_run_wall_seconds Duración de la última ejecución",
+            "# TYPE mcstats_run_wall_seconds gauge",
+            f"mcstats_run_wall_seconds {data['wall_seconds']}",
+            "# HELP mcstats_run_cpu_seconds Tiempo de CPU de la última ejecución",
+            "# TYPE mcstats_run_cpu_seconds gauge",
+            f"mcstats_run_cpu_seconds {data['cpu_seconds']}",
+            "# HELP mcstats_run_status Resultado de la última ejecución (1 en el estado actual)",
+            "# TYPE mcstats_run_status gauge",
+        ]
+        for status in ("ok", "unchanged", "error"):
+            lines.append(f'mcstats_run_status{{status="{status}"}} {int(data["status"] == status)}')
+
+        keys = sorted({key for stage in data["stages"].values() for key in stage})
+        for key in keys:
+            metric = f"mcstats_stage_{key}"
+            lines.append(f"# TYPE {metric} gauge")
+            for name, stage in data["stages"].items():
+                if key in stage:
+                    lines.append(f'{metric}{{stage="{name}"}} {stage[key]}')
+        write_atomic(path, "\n".join(lines) + "\n")
+
+    def save(self, config):
+        """Escribe los archivos configurados; un fallo aquí no debe tumbar la ejecución"""
+        for path, write in ((config.metrics_path, self.write_json),
+                            (config.prometheus_textfile, self.write_prometheus)):
+            if path:
+                try:
+                    write(path)
+                except OSError as e:
+                    log.warning(f"⚠️  No se pudieron guardar las métricas en {path}: {e}")
+
+def write_atomic(path, text):
+    # node_exporter puede leer el textfile en cualquier momento: nunca a medias
+    with open(path + ".tmp", 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(path + ".tmp", path)
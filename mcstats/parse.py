@@ -0,0 +1,83 @@
+"""
+Etapa parse: convierte los JSON descargados en registros de jugador
+
+Con MINECRAFT_PARSE_WORKERS el JSON de cada jugador se decodifica y se
+resume en un pool de procesos mientras fetch sigue descargando
+(summarize_raw y advancements_raw); aquí solo queda montar el registro.
+"""
+
+from mcstats import jsonio
+from mcstats.agent import summarize_stats, completed_advancements
+from mcstats.metrics import Metrics
+from mcstats.record import PlayerRecord
+
+class ParseResult:
+    """Salida de parse: texturas y (posición en el listado, registro) según llegan"""
+    def __init__(self, skins, players):
+        self.skins = skins
+        self.players = players
+
+def build_player(uuid, name, stats_data, adv_data, items=True):
+    return player_record(uuid, name, summarize_stats(stats_data, items), completed_advancements(adv_data))
+
+def summarize_raw(data, items=True):
+    """En el pool de procesos: del archivo de stats crudo a su resumen"""
+    return summarize_stats(jsonio.loads(data), items)
+
+def advancements_raw(data):
+    """En el pool de procesos: del archivo de logros crudo a los completados"""
+    return list(completed_advancements(jsonio.loads(data)))
+
+def player_record(uuid, name, summary, advancements):
+    return PlayerRecord(uuid, name, summary["total_blocks"], summary["total_killed"], summary["deaths"],
+                        summary["jumps"], summary["ticks"], summary["extras"], advancements,
+                        summary.get("items"))
+
+def parse_entry(fname, entry, names, cache=None, items=True):
+    """
+    Registro del jugador a partir de su entrada de fetch (None si no se
+    puede procesar). Los que ya venían procesados solo toman el nombre
+    actual de usercache.json. Sin items no se guardan las cantidades por
+    objeto (Config.item_stats).
+    """
+    uuid = fname[:-5]
+    name = names.get(uuid.replace("-", ""), uuid)
+    if "record" in entry:
+        record = entry["record"]
+        record.name = name
+        return record
+
+    try:
+        if "summary" in entry:
+            player = player_record(uuid, name, entry["summary"], entry["completed"])
+        else:
+            player = build_player(uuid, name, entry["stats"], entry["advancements"], items)
+    except:
+        return None
+    if cache is not None:
+        cache.store_player(fname, entry["sig"], player)
+    return player
+
+def parse(fetched, config, cache=None, metrics=None):
+    """
+    Etapa parse. Se recorre a la vez que fetch descarga; al terminar guarda
+    la caché (que ya tiene los registros nuevos) y resume la transferencia.
+    """
+    metrics = metrics or Metrics()
+    stage = metrics.get("parse")
+
+    def players():
+        processed = 0
+        for index, fname, entry in fetched.items:
+            player = parse_entry(fname, entry, fetched.names, cache, config.item_stats)
+            if player is None:
+                stage.add("errors")
+                continue
+            processed += 1
+            yield index, player
+        stage.add("players", processed)
+        if cache is not None:
+            cache.save(config)
+        fetched.report(processed)
+
+    return ParseResult(fetched.skins, metrics.timed("parse", players()))
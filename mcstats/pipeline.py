@@ -0,0 +1,103 @@
+"""
+Orquestación de las etapas: fetch → parse → classify → aggregate → render
+
+fetch y parse se recorren a la vez (cada jugador se procesa en cuanto
+llega); classify, aggregate y render trabajan sobre la salida completa de
+la etapa anterior. Con checkpoints cada etapa guarda su salida y run()
+puede empezar en cualquiera de ellas a partir de lo guardado.
+
+El modo watch (watch.py) llama a run() en cada cambio con su propia sesión
+abierta, su caché y el listado del mundo, que se conservan entre pasadas.
+"""
+
+from mcstats.aggregate import aggregate
+from mcstats.cache import Cache
+from mcstats.checkpoints import STAGES, Checkpoints
+from mcstats.classify import classify
+from mcstats.errors import StatsError
+from mcstats.fetch import fetch, open_source
+from mcstats.metrics import Metrics
+from mcstats.parse import parse
+from mcstats.render import render
+
+def run(config, from_stage="fetch", metrics=None, cache=None, session=None, listing=None):
+    """
+    Ejecuta las etapas desde from_stage. Devuelve False si no hubo cambios
+    que publicar. Las métricas se guardan al final aunque algo falle.
+    """
+    metrics = metrics or Metrics()
+    try:
+        written = run_stages(config, from_stage, metrics, cache, session, listing)
+    except BaseException:
+        metrics.status = "error"
+        raise
+    else:
+        metrics.status = "ok" if written else "unchanged"
+        return written
+    finally:
+        metrics.save(config)
+
+def run_stages(config, from_stage, metrics, cache=None, session=None, listing=None):
+    if from_stage not in STAGES:
+        raise StatsError(f"Etapa desconocida: {from_stage}")
+    start = STAGES.index(from_stage)
+
+    checkpoints = Checkpoints(config.checkpoint_dir) if config.checkpoint_dir else None
+    if start > 0 and checkpoints is None:
+        raise StatsError(f"Para empezar en {from_stage} hace falta MINECRAFT_CHECKPOINT_DIR")
+
+    if cache is None:
+        cache = Cache(config.cache_dir, items=config.item_stats)
+    source = ssh = None
+
+    def close_source():
+        nonlocal source, ssh
+        if session is not None:
+            # La sesión del modo watch sigue abierta para la siguiente pasada
+            session.release()
+            return
+        if source is not None:
+            source.close()
+            source = None
+        if ssh is not None:
+            ssh.close()
+            ssh = None
+
+    try:
+        if start <= STAGES.index("classify"):
+            if start == 0:
+                config.validate()
+                if session is not None:
+                    source, ssh = session.open(metrics)
+                else:
+                    source, ssh = open_source(config, metrics)
+                fetched = fetch(config, source, cache, ssh, metrics, listing)
+                if checkpoints:
+                    fetched = checkpoints.record_fetch(fetched)
+            if start <= STAGES.index("parse"):
+                if start > 0:
+                    fetched = checkpoints.load_fetch()
+                # Al retomar no se toca la caché: no se ha leído el mundo
+                parsed = parse(fetched, config, cache if start == 0 else None, metrics)
+                if checkpoints:
+                    parsed = checkpoints.record_parse(parsed)
+            else:
+                parsed = checkpoints.load_parse()
+
+            classification = classify(parsed, config, metrics)
+            close_source()
+            if checkpoints:
+                checkpoints.save_classify(classification)
+        else:
+            classification = checkpoints.load_classify()
+
+        if start <= STAGES.index("aggregate"):
+            server_stats = aggregate(classification, metrics)
+            if checkpoints:
+                checkpoints.save_aggregate(server_stats)
+        else:
+            server_stats = checkpoints.load_aggregate()
+
+        return render(classification, server_stats, config, cache, metrics)
+    finally:
+        close_source()
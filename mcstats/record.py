@@ -0,0 +1,124 @@
+"""
+Registro compacto de un jugador. Con decenas de miles de jugadores en
+memoria un dict por jugador (más su dict de extras y el de logros con las
+fechas de cada criterio) pesa mucho más que los datos:
+
+- los contadores principales son atributos con __slots__
+- las claves de minecraft:custom son ids del registro de statkeys; van
+  ordenadas por nombre en un StatLayout compartido por todos los jugadores
+  con las mismas claves, y los valores en un array en ese mismo orden
+- de los logros solo se guardan las claves de los completados (internadas)
+- los contadores por objeto (minecraft:mined...) van por categoría en dos
+  arrays: ids del registro de objetos y cantidades
+
+as_dict() devuelve la forma de siempre (la de checkpoints, caché y la
+página); los logros salen como {"clave": {"done": true}}, igual que en el
+modo agent.
+"""
+
+import functools
+import sys
+from array import array
+
+from mcstats.statkeys import item_registry, registry
+from mcstats.utils import ticks_to_time
+
+class StatLayout:
+    """Ids de las claves de extras de un jugador, en orden, con su posición"""
+    __slots__ = ("ids", "index")
+
+    def __init__(self, ids):
+        self.ids = array('I', ids)
+        self.index = {stat_id: i for i, stat_id in enumerate(ids)}
+
+# Combinaciones de claves distintas que se guardan; más allá se descartan
+# las menos usadas (un jugador conserva la suya aunque salga de la caché)
+LAYOUT_CACHE_SIZE = 4096
+
+@functools.lru_cache(maxsize=LAYOUT_CACHE_SIZE)
+def stat_layout(keys):
+    """StatLayout de una tupla de claves ya ordenada"""
+    return StatLayout(tuple(registry.id(key) for key in keys))
+
+def compact_values(values):
+    """array de enteros de 64 bits; si algún valor no cabe, tupla"""
+    values = list(values)
+    try:
+        return array('q', values)
+    except (TypeError, OverflowError):
+        return tuple(values)
+
+def compact_items(items):
+    """(categoría, ids de objeto, cantidades) de cada categoría"""
+    return tuple((sys.intern(category), array('I', (item_registry.id(item) for item in counts)),
+                  compact_values(counts.values()))
+                 for category, counts in items.items())
+
+class PlayerRecord:
+    __slots__ = ("uuid", "name", "total_blocks", "total_killed", "deaths", "jumps", "ticks",
+                 "layout", "values", "advancements", "items")
+
+    def __init__(self, uuid, name, total_blocks, total_killed, deaths, jumps, ticks, extras, advancements,
+                 items=None):
+        """
+        extras: dict clave → valor; advancements: claves de los logros
+        completados; items: dict categoría → {objeto: cantidad}
+        """
+        self.uuid = uuid
+        self.name = name
+        self.total_blocks = total_blocks
+        self.total_killed = total_killed
+        self.deaths = deaths
+        self.jumps = jumps
+        self.ticks = ticks
+        keys = tuple(sorted(extras))
+        self.layout = stat_layout(keys)
+        self.values = compact_values(extras[key] for key in keys)
+        self.advancements = tuple(sys.intern(key) for key in advancements)
+        self.items = compact_items(items or {})
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(d["uuid"], d["name"], d["total_blocks"], d["total_killed"], d["deaths"],
+                   d["jumps"], d["ticks"], d["extras"], d.get("advancements", ()), d.get("items"))
+
+    @property
+    def time_txt(self):
+        return ticks_to_time(self.ticks)
+
+    def stat_id(self, stat_id):
+        """Valor de una clave de extras por su id (0 si el jugador no la tiene)"""
+        i = self.layout.index.get(stat_id)
+        return 0 if i is None else self.values[i]
+
+    def stat_id_items(self):
+        return zip(self.layout.ids, self.values)
+
+    def stat_items(self):
+        return ((registry.key(i), value) for i, value in self.stat_id_items())
+
+    @property
+    def extras(self):
+        return dict(self.stat_items())
+
+    def item_data(self):
+        return {category: {item_registry.key(i): count for i, count in zip(ids, counts)}
+                for category, ids, counts in self.items}
+
+    def advancement_data(self):
+        return {key: {"done": True} for key in self.advancements}
+
+    def as_dict(self):
+        return {
+            "uuid": self.uuid,
+            "name": self.name,
+            "total_blocks": self.total_blocks,
+            "total_killed": self.total_killed,
+            "deaths": self.deaths,
+            "jumps": self.jumps,
+            "ticks": self.ticks,
+            "time_txt": self.time_txt,
+            "extras": self.extras,
+            "advancements": self.advancement_data(),
+            "items": self.item_data()
+        }
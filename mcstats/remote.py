@@ -0,0 +1,132 @@
+"""
+Todo lo que necesita una conexión SSH: conectar, el modo tar y el agente
+"""
+
+import logging
+import os
+import posixpath
+import shlex
+import socket
+import tarfile
+
+from mcstats import jsonio
+from mcstats.errors import StatsError
+from mcstats.sources import ArchiveSource, relative_path, zstandard
+
+log = logging.getLogger(__name__)
+
+AGENT_SOURCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "agent.py")
+
+def connect_ssh(config):
+    import paramiko
+
+    log.debug(f"🔌 Conectando a {config.ssh_host}:{config.ssh_port}...")
+
+    ssh = paramiko.SSHClient()
+    ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+
+    try:
+        # Sin Nagle: con varios canales en vuelo las peticiones pequeñas
+        # no esperan al ACK de la anterior
+        sock = socket.create_connection((config.ssh_host, config.ssh_port), timeout=15)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        ssh.connect(
+            config.ssh_host,
+            port=config.ssh_port,
+            username=config.ssh_user,
+            password=config.ssh_password,
+            timeout=15,
+            sock=sock
+        )
+        if config.ssh_keepalive:
+            ssh.get_transport().set_keepalive(config.ssh_keepalive)
+        log.info("✅ Conexión SSH exitosa")
+    except Exception as e:
+        raise StatsError(f"No se pudo conectar por SSH: {e}")
+    return ssh
+
+# ================= REMOTE ARCHIVE =================
+# En modo tar el servidor empaqueta stats/, advancements/, skinrestorer/ y
+# usercache.json en un único flujo comprimido que se desempaqueta en memoria.
+# Miles de open/read/close por SFTP se convierten en una sola transferencia.
+def archive_command(config):
+    members = " ".join(shlex.quote(relative_path(p)) for p in
+                       (config.stats_folder, config.advancements_folder,
+                        config.skinrestorer_folder, config.usercache_path))
+    compressor = "gzip -c"
+    if config.archive_compression == "zstd" and zstandard is not None:
+        compressor = "{ if command -v zstd >/dev/null 2>&1; then zstd -q -c; else gzip -c; fi; }"
+    return (
+        "command -v tar >/dev/null 2>&1 || exit 127; "
+        f"cd {shlex.quote(config.server_root)} || exit 1; "
+        f"set --; for p in {members}; do [ -e \"$p\" ] && set -- \"$@\" \"$p\"; done; "
+        f"[ $# -gt 0 ] || exit 1; tar -cf - \"$@\" | {compressor}"
+    )
+
+# ================= CHANGE FEED =================
+# En modo watch el servidor avisa de cada archivo que cambia: inotifywait -m
+# si está instalado y si no agent.py --watch (inotify con ctypes). Los dos
+# escriben "carpeta/archivo" por línea, relativo a server_root, y
+# "Watches established." por stderr cuando ya vigilan.
+def feed_command(config, python, agent):
+    folders = " ".join(shlex.quote(relative_path(p) or ".") for p in
+                       (config.stats_folder, config.advancements_folder, config.skinrestorer_folder,
+                        posixpath.dirname(config.usercache_path)))
+    return (
+        f"cd {shlex.quote(config.server_root)} || exit 1; "
+        f"set --; for p in {folders}; do [ -d \"$p\" ] && set -- \"$@\" \"$p\"; done; "
+        "[ $# -gt 0 ] || exit 1; "
+        "if command -v inotifywait >/dev/null 2>&1; then "
+        "exec inotifywait -m -e close_write -e moved_to -e moved_from -e delete --format '%w%f' \"$@\"; fi; "
+        f"exec {shlex.quote(python)} {shlex.quote(agent)} --watch \"$@\""
+    )
+
+def fetch_remote_archive(ssh, config):
+    stdin, stdout, stderr = ssh.exec_command(archive_command(config))
+    stdin.close()
+    try:
+        archive = ArchiveSource(stdout)
+    except tarfile.TarError:
+        status = stdout.channel.recv_exit_status()
+        error = stderr.read().decode('utf-8', 'replace').strip()
+        raise RuntimeError(error or f"el comando terminó con código {status}")
+
+    status = stdout.channel.recv_exit_status()
+    if status != 0 or not archive.files:
+        raise RuntimeError(f"el comando terminó con código {status}")
+    return archive
+
+# ================= REMOTE AGENT =================
+# En modo agent se sube agent.py al servidor y se ejecuta allí: solo viaja
+# un resumen de unos cientos de bytes por jugador.
+def run_agent(ssh, sftp, config):
+    sftp.put(AGENT_SOURCE, config.agent_path)
+    try:
+        command = " ".join([
+            f"cd {shlex.quote(config.server_root)} &&",
+            shlex.quote(config.agent_python),
+            shlex.quote(relative_path(config.agent_path)),
+            *(["--items"] if config.item_stats else []),
+            shlex.quote(relative_path(config.world_path)),
+            shlex.quote(relative_path(config.usercache_path))
+        ])
+        stdin, stdout, stderr = ssh.exec_command(command)
+        stdin.close()
+
+        records = []
+        received = 0
+        for line in stdout:
+            received += len(line)
+            if line.strip():
+                records.append(jsonio.loads(line))
+
+        status = stdout.channel.recv_exit_status()
+        if status != 0:
+            error = stderr.read().decode('utf-8', 'replace').strip()
+            raise RuntimeError(error or f"el agente terminó con código {status}")
+        return records, received
+    finally:
+        try:
+            sftp.remove(config.agent_path)
+        except:
+            pass
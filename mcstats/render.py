@@ -0,0 +1,271 @@
+"""
+Etapa render: rellena template.html y escribe los archivos publicados
+"""
+
+import hashlib
+import itertools
+import json
+import logging
+import os
+from datetime import datetime
+
+from mcstats import jsonio
+from mcstats.artifacts import ArtifactWriter
+from mcstats.classify import leaderboard_definitions
+from mcstats.errors import StatsError
+from mcstats.metrics import Metrics
+from mcstats.statkeys import registry
+
+log = logging.getLogger(__name__)
+
+class PageBuilder:
+    """Convierte los registros de jugador en los datos JSON de la página"""
+
+    def __init__(self, classification, config):
+        self.classification = classification
+        self.config = config
+        self.skins = classification.skins
+        self.columnar = config.stats_encoding == "columnar"
+
+        # Detalle por jugador: los del top, los bots y los que salen en alguna
+        # clasificación (pueden no estar entre los top_limit por tiempo). Sin
+        # split_details estos últimos van completos en la página
+        self.detail_players = {}
+        self.board_players = []
+        if config.split_details:
+            for p in itertools.chain(classification.real, classification.bots,
+                                     *classification.boards.values()):
+                self.detail_players[p.uuid] = p
+        else:
+            listed = {p.uuid for p in itertools.chain(classification.real, classification.bots)}
+            for p in itertools.chain(*classification.boards.values()):
+                if p.uuid not in listed:
+                    listed.add(p.uuid)
+                    self.board_players.append(p)
+
+        # Tabla de claves compartida (ordenada para que sea estable entre
+        # ejecuciones). Su versión va en la URL de los perfiles para no
+        # mezclar tablas en caché. stat_key_index va del id del registro a la
+        # posición en la tabla.
+        self.stat_keys = []
+        if self.columnar:
+            emitted = (self.detail_players.values() if config.split_details
+                       else itertools.chain(classification.real, classification.bots, self.board_players))
+            self.stat_keys = sorted(registry.key(i) for i in {i for p in emitted for i in p.layout.ids})
+        self.stat_key_index = {registry.id(k): i for i, k in enumerate(self.stat_keys)}
+
+    def skin_url(self, uuid, name, size=80):
+        uuid_clean = uuid.replace("-", "")
+        if uuid_clean in self.skins:
+            return f"https://mc-heads.net/avatar/{self.skins[uuid_clean]}/{size}"
+        else:
+            return f"https://mc-heads.net/avatar/{name}/{size}"
+
+    def summary(self, p):
+        """Lo que necesitan las tarjetas de la página"""
+        return {
+            "uuid": p.uuid,
+            "name": p.name,
+            "skin": self.skin_url(p.uuid, p.name, 80),
+            "time_txt": p.time_txt,
+            "ticks": p.ticks,
+            "blocks": p.total_blocks,
+            "kills": p.total_killed,
+            "deaths": p.deaths
+        }
+
+    def encode_extras(self, p):
+        """Pares planos [índice, valor, ...] sobre stat_keys; el orden se conserva"""
+        if not self.columnar:
+            return p.extras
+        encoded = []
+        for stat_id, v in p.stat_id_items():
+            encoded.append(self.stat_key_index[stat_id])
+            encoded.append(v)
+        return encoded
+
+    def encode_ranks(self, ranks):
+        """Con columnar, los puestos de los extras como [índice, puesto, top, ...]"""
+        if not self.columnar or "extras" not in ranks:
+            return ranks
+        encoded = []
+        for key, (rank, top) in ranks["extras"].items():
+            encoded.extend((self.stat_key_index[registry.id(key)], rank, top))
+        return dict(ranks, extras=encoded)
+
+    def payload(self, p):
+        """Registro completo que usa el perfil"""
+        payload = {
+            "uuid": p.uuid,
+            "name": p.name,
+            "skin": self.skin_url(p.uuid, p.name, 80),
+            "time_txt": p.time_txt,
+            "ticks": p.ticks,
+            "blocks": p.total_blocks,
+            "kills": p.total_killed,
+            "deaths": p.deaths,
+            "jumps": p.jumps,
+            "extras": self.encode_extras(p),
+            "advancements": p.advancement_data()
+        }
+        # Sin clasificaciones por objeto ni puestos el agente no las envía
+        if self.config.item_stats:
+            payload["items"] = p.item_data()
+        if self.classification.ranks is not None:
+            payload["ranks"] = self.encode_ranks(self.classification.ranks.get(p.uuid, {}))
+        return payload
+
+    def build(self):
+        """Partes JSON de la página y el detalle de cada perfil"""
+        classification = self.classification
+        stat_keys_json = jsonio.dumps(self.stat_keys)
+        inline_payload = self.summary if self.config.split_details else self.payload
+
+        data = {
+            "players": jsonio.dumps([inline_payload(p) for p in classification.real]),
+            "bots": jsonio.dumps([inline_payload(p) for p in classification.bots]),
+            "board_players": jsonio.dumps([self.payload(p) for p in self.board_players]),
+            "leaderboards": jsonio.dumps([{
+                "key": key,
+                "title": title,
+                "entries": [{
+                    "uuid": p.uuid,
+                    "name": p.name,
+                    "skin": self.skin_url(p.uuid, p.name, 80),
+                    "value": value(p),
+                    "value_txt": fmt(value(p))
+                } for p in classification.boards.get(key, [])]
+            } for key, title, value, fmt in leaderboard_definitions(self.config)]),
+            "stat_keys": stat_keys_json,
+            "stat_keys_version": hashlib.sha1(stat_keys_json.encode('utf-8')).hexdigest()[:8] if self.stat_keys else "",
+            # Clasificaciones por objeto: van aparte, en config.item_leaderboards
+            "items": (jsonio.dumps(classification.item_boards)
+                      if self.config.item_leaderboards and classification.item_boards is not None else ""),
+        }
+        details = {uuid: jsonio.dumps(self.payload(p))
+                   for uuid, p in self.detail_players.items()}
+        return data, details
+
+def read_template(config):
+    log.debug("📄 Leyendo template HTML...")
+    if not os.path.exists(config.template_path):
+        raise StatsError(f"No se encontró {config.template_path}")
+
+    with open(config.template_path, 'r', encoding='utf-8') as f:
+        html_template = f.read()
+
+    log.debug(f"✅ Template leído: {len(html_template)} caracteres")
+
+    # VERIFICAR placeholder
+    if '{PLAYERS_DATA}' in html_template:
+        log.debug("   ✅ {PLAYERS_DATA} encontrado")
+    else:
+        log.warning("❌ {PLAYERS_DATA} NO encontrado en el template")
+        if '{{PLAYERS_DATA}}' in html_template:
+            log.warning("⚠️  Corrigiendo {{PLAYERS_DATA}} → {PLAYERS_DATA}")
+            html_template = html_template.replace('{{PLAYERS_DATA}}', '{PLAYERS_DATA}')
+    return html_template
+
+def content_hash(data, details, server_stats, html_template):
+    """Hash de todo lo que acaba publicado salvo la hora de actualización"""
+    digest = hashlib.sha256()
+    for part in (data["players"], data["bots"], data["board_players"], data["leaderboards"], data["stat_keys"], data["items"],
+                 json.dumps(server_stats, sort_keys=True), html_template):
+        digest.update(part.encode('utf-8'))
+        digest.update(b"\0")
+    for uuid in sorted(details):
+        digest.update(f"{uuid}\0{details[uuid]}\0".encode('utf-8'))
+    return digest.hexdigest()
+
+def fill_template(html_template, data, server_stats, now):
+    log.debug("🔄 Reemplazando placeholders...")
+    html = html_template.replace('{PLAYERS_DATA}', data["players"])
+    html = html.replace('{BOTS_DATA}', data["bots"])
+    html = html.replace('{BOARD_PLAYERS_DATA}', data["board_players"])
+    html = html.replace('{LEADERBOARDS_DATA}', data["leaderboards"])
+    html = html.replace('{STAT_KEYS}', data["stat_keys"])
+    html = html.replace('{STAT_KEYS_VERSION}', data["stat_keys_version"])
+    html = html.replace('{UPDATE_TIME}', now)
+    html = html.replace('{PLAYER_COUNT}', str(server_stats['player_count']))
+    html = html.replace('{TOTAL_TIME}', server_stats['total_time'])
+    html = html.replace('{TOTAL_BLOCKS}', server_stats['total_blocks'])
+    html = html.replace('{TOTAL_DISTANCE}', server_stats['total_distance'])
+    html = html.replace('{TOTAL_KILLS}', server_stats['total_kills'])
+    html = html.replace('{AVG_TIME}', server_stats['avg_time'])
+
+    # Verificar reemplazo
+    if '{PLAYERS_DATA}' in html:
+        log.error("❌ ERROR: {PLAYERS_DATA} NO se reemplazó")
+    else:
+        log.debug("   ✅ Todos los placeholders reemplazados")
+    return html
+
+def render(classification, server_stats, config, cache=None, metrics=None):
+    """
+    Etapa render. Devuelve False sin escribir nada si lo publicado no
+    cambió desde la ejecución anterior (salvo con config.force).
+    """
+    metrics = metrics or Metrics()
+    with metrics.stage("render") as stage:
+        builder = PageBuilder(classification, config)
+        data, details = builder.build()
+
+        log.debug(f"📝 JSON de jugadores generado: {len(data['players'])} caracteres, "
+                  f"{len(classification.real)} jugadores")
+        if builder.stat_keys:
+            log.debug(f"   Claves de estadísticas: {len(builder.stat_keys)} (codificación columnar)")
+
+        html_template = read_template(config)
+        writer = ArtifactWriter(config, stage)
+
+        # En CI el directorio de salida es nuevo en cada ejecución: sin
+        # manifiesto vale el último hash de esta misma salida en la caché
+        input_hash = content_hash(data, details, server_stats, html_template)
+        output_key = os.path.abspath(config.output_html)
+        if writer.previous:
+            previous_hash = writer.previous_hash
+        elif cache is not None:
+            previous_hash = cache.load_state().get("input_hashes", {}).get(output_key)
+        else:
+            previous_hash = None
+
+        if previous_hash == input_hash and not config.force:
+            log.info(f"⏭️  Sin cambios desde la última ejecución ({input_hash[:12]}), no se regenera")
+            return False
+
+        now = datetime.now().strftime("%d/%m/%Y %H:%M")
+        html = fill_template(html_template, data, server_stats, now)
+
+        # Guardar
+        size = writer.write(config.output_html, html)["size"]
+        log.info(f"💾 {config.output_html} guardado: {size} bytes")
+
+        if data["items"]:
+            size = writer.write(config.item_leaderboards, data["items"])["size"]
+            log.info(f"🏅 Clasificaciones por objeto en {config.item_leaderboards}: {size} bytes")
+
+        if config.split_details:
+            details_dir = config.details_dir
+            os.makedirs(details_dir, exist_ok=True)
+            detail_bytes = 0
+            for uuid, text in details.items():
+                detail_bytes += writer.write(f"{details_dir}/{uuid}.json", text)["size"]
+
+            # Quitar los de jugadores que ya no aparecen (y sus copias comprimidas)
+            for fname in os.listdir(details_dir):
+                uuid = fname.split(".", 1)[0]
+                if fname.endswith((".json", ".json.gz", ".json.br")) and uuid not in details:
+                    os.remove(os.path.join(details_dir, fname))
+
+            log.info(f"✅ {len(details)} perfiles en {details_dir}/ ({detail_bytes} bytes)")
+
+        writer.report()
+        writer.save(input_hash)
+        if cache is not None:
+            state = cache.load_state()
+            state.setdefault("input_hashes", {})[output_key] = input_hash
+            cache.save_state(state)
+
+        log.info(f"🚀 GENERACIÓN COMPLETADA: {len(classification.real)} jugadores, "
+                 f"{len(classification.bots)} bots, actualizado {now}")
+        return True
@@ -0,0 +1,214 @@
+"""
+Orígenes de datos: SFTP, disco local o un tar
+"""
+
+import os
+import posixpath
+import tarfile
+import threading
+from collections import namedtuple
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Las etapas leen el mundo a través de un "source" con la misma
+# interfaz: listdir_attr(carpeta), stat(ruta), read(ruta) -> bytes, close().
+# Las rutas son siempre las del SFTP ("/world/stats/<uuid>.json").
+# bytes_read acumula lo leído del origen para medir el caudal de cada run.
+FileAttr = namedtuple("FileAttr", "filename st_size st_mtime")
+
+def relative_path(path):
+    """Ruta relativa a la raíz del SFTP (y a server_root en el servidor)"""
+    return posixpath.normpath(path).lstrip("/")
+
+class SFTPSource:
+    """
+    Lectura remota por SFTP. Cada hilo del pool abre su propio canal sobre
+    la misma conexión SSH, así las lecturas viajan en paralelo en lugar de
+    pagar un RTT tras otro.
+    """
+    cacheable = True
+
+    def __init__(self, ssh):
+        self.ssh = ssh
+        self.sftp = ssh.open_sftp()
+        self.local = threading.local()
+        self.channels = []
+        self.lock = threading.Lock()
+        self.bytes_read = 0
+
+    def worker_sftp(self):
+        client = getattr(self.local, "sftp", None)
+        if client is None:
+            try:
+                client = self.ssh.open_sftp()
+                with self.lock:
+                    self.channels.append(client)
+            except Exception:
+                # El servidor no admite más canales: compartir el principal
+                client = self.sftp
+            self.local.sftp = client
+        return client
+
+    def listdir_attr(self, folder):
+        return self.sftp.listdir_attr(folder)
+
+    def stat(self, path):
+        return self.sftp.stat(path)
+
+    def read(self, path, size=None):
+        """
+        Con el tamaño del listado se piden todos los bloques a la vez
+        (prefetch) y se lee exactamente ese tamaño, sin la ida y vuelta
+        extra para detectar el EOF. Sin tamaño se lee hasta el final.
+        """
+        with self.worker_sftp().open(path, 'rb') as f:
+            if size:
+                f.prefetch(size)
+                data = f.read(size)
+            else:
+                data = f.read()
+        with self.lock:
+            self.bytes_read += len(data)
+        return data
+
+    def close_workers(self):
+        """
+        Cierra los canales de los hilos. Cada pool de fetch trae hilos
+        nuevos: sin esto una sesión larga acumularía canales hasta agotar
+        MaxSessions.
+        """
+        with self.lock:
+            channels, self.channels = self.channels, []
+            self.local = threading.local()
+        for client in channels:
+            client.close()
+
+    def close(self):
+        self.close_workers()
+        self.sftp.close()
+
+class LocalSource:
+    """Lectura directa del disco, para ejecutar el script en el propio servidor"""
+    cacheable = False
+
+    def __init__(self, root):
+        self.root = root
+        self.bytes_read = 0
+
+    def local_path(self, path):
+        return os.path.join(self.root, relative_path(path))
+
+    def listdir_attr(self, folder):
+        attrs = []
+        with os.scandir(self.local_path(folder)) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    st = entry.stat()
+                    attrs.append(FileAttr(entry.name, st.st_size, int(st.st_mtime)))
+        return attrs
+
+    def stat(self, path):
+        st = os.stat(self.local_path(path))
+        return FileAttr(posixpath.basename(path), st.st_size, int(st.st_mtime))
+
+    def read(self, path, size=None):
+        with open(self.local_path(path), 'rb') as f:
+            data = f.read()
+        self.bytes_read += len(data)
+        return data
+
+    def close(self):
+        pass
+
+class ArchiveSource:
+    """
+    Un tar (gzip, zstd, bzip2, xz o sin comprimir) desempaquetado en memoria.
+    Sirve tanto para copias de seguridad descargadas como para el flujo que
+    genera el servidor en modo tar. Las rutas del tar son relativas a la raíz.
+    """
+    cacheable = False
+
+    def __init__(self, fileobj):
+        self.files = {}
+        self.folders = set()
+        self.counter = PrefixedStream(b"", fileobj)
+        with open_tar_stream(self.counter) as stream:
+            for member in stream:
+                key = relative_path(member.name)
+                if member.isdir():
+                    self.folders.add(key)
+                elif member.isfile():
+                    attr = FileAttr(posixpath.basename(key), member.size, int(member.mtime))
+                    self.files[key] = (attr, stream.extractfile(member).read())
+                    self.folders.add(posixpath.dirname(key))
+
+    def listdir_attr(self, folder):
+        key = relative_path(folder)
+        if key not in self.folders:
+            raise IOError(f"{folder} no está en el archivo")
+        return [attr for path, (attr, _) in self.files.items()
+                if posixpath.dirname(path) == key]
+
+    def entry(self, path):
+        entry = self.files.get(relative_path(path))
+        if entry is None:
+            raise IOError(f"{path} no está en el archivo")
+        return entry
+
+    def stat(self, path):
+        return self.entry(path)[0]
+
+    def read(self, path, size=None):
+        return self.entry(path)[1]
+
+    @property
+    def bytes_read(self):
+        return self.counter.count
+
+    def close(self):
+        self.files = {}
+
+def open_tar_stream(fileobj):
+    """Abre un tar en modo flujo detectando la compresión por la cabecera"""
+    magic = fileobj.read(6)
+    stream = PrefixedStream(magic, fileobj)
+    if magic[:2] == b"\x1f\x8b":
+        return tarfile.open(fileobj=stream, mode="r|gz")
+    if magic[:3] == b"BZh":
+        return tarfile.open(fileobj=stream, mode="r|bz2")
+    if magic == b"\xfd7zXZ\x00":
+        return tarfile.open(fileobj=stream, mode="r|xz")
+    if magic[:4] == b"\x28\xb5\x2f\xfd":
+        if zstandard is None:
+            raise RuntimeError("archivo zstd y el módulo zstandard no está instalado")
+        return tarfile.open(fileobj=zstandard.ZstdDecompressor().stream_reader(stream), mode="r|")
+    return tarfile.open(fileobj=stream, mode="r|")
+
+class PrefixedStream:
+    """
+    Devuelve primero los bytes ya leídos y después el resto del flujo,
+    contando los bytes que se leen del flujo original
+    """
+    def __init__(self, prefix, stream):
+        self.prefix = prefix
+        self.stream = stream
+        self.count = 0
+
+    def read_stream(self, size=-1):
+        data = self.stream.read(size)
+        self.count += len(data)
+        return data
+
+    def read(self, size=-1):
+        if not self.prefix:
+            return self.read_stream(size)
+        if size is None or size < 0:
+            data, self.prefix = self.prefix + self.read_stream(), b""
+            return data
+        data, self.prefix = self.prefix[:size], self.prefix[size:]
+        if len(data) < size:
+            data += self.read_stream(size - len(data))
+        return data
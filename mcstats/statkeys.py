@@ -0,0 +1,35 @@
+"""
+Registros de las claves de estadística (minecraft:custom) y de los objetos
+de las categorías por objeto (minecraft:mined...) del proceso: cada clave
+recibe un id entero la primera vez que aparece. Los registros de jugador
+guardan ids en lugar de cadenas y aggregate, classify y render comparten
+las mismas tablas.
+"""
+
+import sys
+import threading
+
+class StatKeys:
+    def __init__(self):
+        self.keys = []
+        self.ids = {}
+        # fetch crea registros desde varios hilos (caché)
+        self.lock = threading.Lock()
+
+    def id(self, key):
+        i = self.ids.get(key)
+        if i is None:
+            with self.lock:
+                i = self.ids.get(key)
+                if i is None:
+                    key = sys.intern(key)
+                    i = len(self.keys)
+                    self.keys.append(key)
+                    self.ids[key] = i
+        return i
+
+    def key(self, i):
+        return self.keys[i]
+
+registry = StatKeys()
+item_registry = StatKeys()
@@ -0,0 +1,25 @@
+"""
+Formatos de texto y cálculos comunes a varias etapas
+"""
+
+from mcstats.statkeys import registry
+
+def ticks_to_time(ticks):
+    seconds = ticks // 20
+    hours = seconds // 3600
+    minutes = (seconds % 3600) // 60
+    return f"{hours}h {minutes}m"
+
+def format_number(n):
+    return f"{n:,}".replace(",", ".")
+
+def format_km(cm):
+    return f"{cm / 100000:,.0f}".replace(",", ".") + " km"
+
+DISTANCE_KEYS = ["minecraft:walk_one_cm", "minecraft:sprint_one_cm", "minecraft:fly_one_cm", 
+                 "minecraft:swim_one_cm", "minecraft:aviate_one_cm", "minecraft:boat_one_cm",
+                 "minecraft:minecart_one_cm", "minecraft:horse_one_cm"]
+DISTANCE_IDS = [registry.id(key) for key in DISTANCE_KEYS]
+
+def player_distance(p):
+    return sum(int(p.stat_id(i)) for i in DISTANCE_IDS)
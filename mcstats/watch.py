@@ -0,0 +1,262 @@
+"""
+Modo watch: un proceso de larga duración que mantiene abiertas la sesión
+SSH y el SFTP (con keepalive, y reconectando si se caen) y regenera solo
+cuando cambia algún archivo del mundo.
+
+Los cambios llegan del propio servidor (ChangeFeed: inotifywait o el
+agente vigilando las carpetas); solo se vuelve a leer la firma de los
+archivos avisados y el listado del mundo se mantiene al día sin volver a
+listarlo. Si el servidor no tiene inotify se lista todo cada
+config.watch_interval segundos y se comparan tamaños y mtimes.
+
+En los dos casos los jugadores sin cambios salen de la caché, que se
+conserva en memoria entre pasadas: cada regeneración solo descarga y
+procesa los archivos que cambiaron.
+"""
+
+import dataclasses
+import logging
+import posixpath
+import queue
+import subprocess
+import sys
+import threading
+import time
+
+from mcstats.cache import Cache
+from mcstats.errors import StatsError
+from mcstats.fetch import list_world
+from mcstats.metrics import Metrics
+from mcstats.pipeline import run
+from mcstats.remote import AGENT_SOURCE, connect_ssh, feed_command
+from mcstats.sources import LocalSource, SFTPSource, relative_path
+
+log = logging.getLogger(__name__)
+
+# Espera máxima tras fallos seguidos (la espera se dobla en cada uno)
+MAX_BACKOFF = 300
+# Los autosaves escriben a todos los jugadores de golpe: tras el primer
+# aviso se espera a que pasen SETTLE segundos sin más para regenerar una vez
+SETTLE = 1.0
+FEED_TIMEOUT = 15
+
+class Session:
+    """Origen abierto que sobrevive entre pasadas; open() lo reabre si se cayó"""
+    def __init__(self, config):
+        self.config = config
+        self.source = None
+        self.ssh = None
+
+    def alive(self):
+        if self.source is None:
+            return False
+        if self.ssh is None:
+            return True
+        transport = self.ssh.get_transport()
+        return transport is not None and transport.is_active()
+
+    def open(self, metrics=None):
+        """(source, ssh) como open_source, con bytes_read de esta pasada"""
+        if not self.alive():
+            self.close()
+            metrics = metrics or Metrics()
+            with metrics.stage("connect"):
+                if self.config.source == "local":
+                    self.source = LocalSource(self.config.server_root)
+                else:
+                    self.ssh = connect_ssh(self.config)
+                    self.source = SFTPSource(self.ssh)
+        self.source.bytes_read = 0
+        return self.source, self.ssh
+
+    def release(self):
+        """Fin de una pasada: se cierran los canales de los hilos, no la sesión"""
+        if isinstance(self.source, SFTPSource):
+            self.source.close_workers()
+
+    def close(self):
+        for closeable in (self.source, self.ssh):
+            if closeable is not None:
+                try:
+                    closeable.close()
+                except Exception:
+                    pass
+        self.source = self.ssh = None
+
+class ChangeFeed:
+    """
+    Rutas (las del SFTP) de los archivos que cambian en el servidor. Con ssh
+    el vigilante corre por exec_command; con el source local, como
+    subproceso. Un hilo lee las líneas y las deja en una cola.
+    """
+    def __init__(self, config, session):
+        self.config = config
+        self.session = session
+        self.queue = queue.Queue()
+        self.alive = False
+        self.uploaded = False
+        self.process = None
+        self.channel = None
+
+        # Carpeta relativa del vigilante → carpeta de config
+        self.folders = {relative_path(folder): folder for folder in
+                        (config.stats_folder, config.advancements_folder, config.skinrestorer_folder)}
+        self.usercache = relative_path(config.usercache_path)
+
+    def start(self):
+        """Lanza el vigilante; False si el servidor no puede vigilar carpetas"""
+        config = self.config
+        if self.session.ssh is None:
+            command = feed_command(config, sys.executable, AGENT_SOURCE)
+            self.process = subprocess.Popen(["sh", "-c", command], stdout=subprocess.PIPE,
+                                            stderr=subprocess.PIPE, text=True)
+            stdout, stderr = self.process.stdout, self.process.stderr
+        else:
+            self.session.source.sftp.put(AGENT_SOURCE, config.agent_path)
+            self.uploaded = True
+            command = feed_command(config, config.agent_python, relative_path(config.agent_path))
+            stdin, stdout, stderr = self.session.ssh.exec_command(command, timeout=FEED_TIMEOUT)
+            stdin.close()
+            self.channel = stdout.channel
+
+        # Hasta que el vigilante confirma no se lista el mundo: así ningún
+        # cambio cae entre el listado y el primer aviso
+        for line in stderr:
+            line = line.decode('utf-8', 'replace') if isinstance(line, bytes) else line
+            if line.strip() == "Watches established.":
+                break
+        else:
+            self.close()
+            return False
+        if self.channel is not None:
+            self.channel.settimeout(None)
+
+        self.alive = True
+        threading.Thread(target=self.read, args=(stdout,), daemon=True).start()
+        return True
+
+    def read(self, stdout):
+        try:
+            for line in stdout:
+                line = line.decode('utf-8', 'replace') if isinstance(line, bytes) else line
+                path = self.config_path(line.strip())
+                if path is not None:
+                    self.queue.put(path)
+        except Exception:
+            pass
+        self.alive = False
+        # Despierta a changes() para que se pase al sondeo
+        self.queue.put(None)
+
+    def config_path(self, line):
+        rel = relative_path(line)
+        if rel == self.usercache:
+            return self.config.usercache_path
+        folder, fname = posixpath.split(rel)
+        if folder in self.folders and fname:
+            return f"{self.folders[folder]}/{fname}"
+        return None
+
+    def changes(self, timeout):
+        """Espera hasta timeout al primer aviso y recoge los que lleguen seguidos"""
+        changed = set()
+        try:
+            path = self.queue.get(timeout=timeout)
+            while path is not None:
+                changed.add(path)
+                path = self.queue.get(timeout=SETTLE)
+        except queue.Empty:
+            pass
+        return changed
+
+    def close(self):
+        self.alive = False
+        if self.process is not None:
+            self.process.kill()
+            self.process.wait()
+        if self.channel is not None:
+            self.channel.close()
+        if self.uploaded:
+            try:
+                self.session.source.sftp.remove(self.config.agent_path)
+            except Exception:
+                pass
+        self.process = self.channel = None
+        self.uploaded = False
+
+def changed_files(previous, current):
+    changed = sum(1 for path, sig in current.items() if previous.get(path) != sig)
+    return changed + sum(1 for path in previous if path not in current)
+
+def open_feed(config, session):
+    feed = ChangeFeed(config, session)
+    try:
+        if feed.start():
+            log.info("👀 Recibiendo los cambios del servidor (inotify)")
+            return feed
+    except Exception as e:
+        feed.close()
+        log.debug(f"   Vigilante no disponible: {e}")
+    log.info(f"👀 Sin inotify en el servidor: comprobando el mundo cada {config.watch_interval:g}s")
+    return None
+
+def watch(config):
+    """Bucle del modo watch; solo termina con Ctrl+C (KeyboardInterrupt)"""
+    if config.source == "archive":
+        raise StatsError("El modo watch necesita el servidor (sftp o local), no una copia")
+    config.validate()
+    if config.transfer_mode != "sftp":
+        # tar y agent leen el mundo entero en cada pasada (y el agente se
+        # subiría a la misma ruta que el vigilante)
+        log.info(f"🗜️  En modo watch se lee por SFTP con la caché en memoria en lugar de {config.transfer_mode}")
+        config = dataclasses.replace(config, transfer_mode="sftp")
+
+    session = Session(config)
+    cache = Cache(config.cache_dir, memory=True, items=config.item_stats)
+    feed = listing = None
+    failures = 0
+    log.info("👀 Modo watch (Ctrl+C para salir)")
+    try:
+        while True:
+            delay = config.watch_interval
+            try:
+                metrics = Metrics()
+                source, _ = session.open(metrics)
+                if listing is None:
+                    # Primera pasada o tras reconectar: vigilar y listar todo
+                    feed = open_feed(config, session)
+                    listing = list_world(config, source)
+                    changed = None
+                elif feed is not None and feed.alive:
+                    paths = feed.changes(config.watch_interval)
+                    for path in paths:
+                        listing.update(source, path)
+                    changed = len(paths)
+                    # changes() ya ha esperado
+                    delay = 0
+                else:
+                    previous = listing.files()
+                    listing = list_world(config, source)
+                    changed = changed_files(previous, listing.files())
+
+                if changed is None or changed:
+                    if changed:
+                        log.info(f"🔄 {changed} archivos cambiaron, regenerando")
+                    cache.start_pass()
+                    run(config, metrics=metrics, cache=cache, session=session, listing=listing)
+                failures = 0
+            except Exception as e:
+                # Conexión caída o pasada fallida: se vuelve a empezar desde
+                # el listado completo
+                failures += 1
+                delay = max(delay, min(config.watch_interval * 2 ** failures, MAX_BACKOFF))
+                log.error(f"❌ ERROR: {e} (reintento en {delay:g}s)")
+                if feed is not None:
+                    feed.close()
+                feed = listing = None
+                session.close()
+            time.sleep(delay)
+    finally:
+        if feed is not None:
+            feed.close()
+        session.close()